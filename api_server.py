@@ -0,0 +1,351 @@
+"""
+Headless HTTP API over the database and bot layers, for mobile and other
+clients that should not pay for a Streamlit script rerun per interaction.
+
+    python api_server.py [--host 127.0.0.1] [--port 8080]
+
+Runs on asyncio with the standard library only. Database work goes to a
+thread pool and LLM calls to a second, larger one, so many slow model calls
+can be awaited at once without blocking cheap requests. All bodies are JSON;
+authenticate with the signed session token returned by /login, sent either as
+"Authorization: Bearer <token>" or as the session cookie /login sets.
+
+    POST   /register   {name, email, phone, password}
+    POST   /login      {email, password}            -> {token, user}
+    POST   /logout
+    GET    /profile                                  PUT /profile {...}
+    GET    /journal    [?metadata=1]                 POST /journal {...}
+    GET    /mood       [?metadata=1]                 POST /mood {...}
+    GET    /chat                                     DELETE /chat
+    POST   /chat       {message}                     -> streamed text/plain reply
+"""
+import argparse
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from http.cookies import SimpleCookie
+from urllib.parse import urlsplit, parse_qs
+
+import database
+import mental_health_bot
+from sessions import SESSION_COOKIE, SESSION_TTL_SECONDS, issue_token, verify_token, revoke_token
+
+DB_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix="mindcare-db")
+LLM_EXECUTOR = ThreadPoolExecutor(max_workers=64, thread_name_prefix="mindcare-llm")
+MAX_BODY_BYTES = 1024 * 1024
+
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+           405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+class Request:
+    def __init__(self, method, target, headers, body):
+        parts = urlsplit(target)
+        self.method = method
+        self.path = parts.path.rstrip("/") or "/"
+        self.query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        self.headers = headers
+        self.body = body
+        self.user = None
+
+    def token(self):
+        header = self.headers.get("authorization", "")
+        if header.startswith("Bearer "):
+            return header[len("Bearer "):]
+        cookie = SimpleCookie(self.headers.get("cookie", ""))
+        return cookie[SESSION_COOKIE].value if SESSION_COOKIE in cookie else None
+
+    def json(self) -> dict:
+        try:
+            data = json.loads(self.body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "Body must be JSON")
+        if not isinstance(data, dict):
+            raise HTTPError(400, "Body must be a JSON object")
+        return data
+
+class StreamingResponse:
+    def __init__(self, chunks, content_type="text/plain; charset=utf-8"):
+        self.chunks = chunks  # async generator of str
+        self.content_type = content_type
+
+async def run_db(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(DB_EXECUTOR, fn, *args)
+
+async def iterate_in_thread(generator_fn, *args):
+    """
+    Drive a blocking generator on the LLM pool and yield its items here.
+    An exception from the generator is re-raised after the last item; if the
+    consumer stops early, the generator is closed at its next item.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    done = object()
+    stop = threading.Event()
+
+    def pump():
+        try:
+            for item in generator_fn(*args):
+                if stop.is_set():
+                    break
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, done)
+
+    pumping = loop.run_in_executor(LLM_EXECUTOR, pump)
+    try:
+        while True:
+            item = await queue.get()
+            if item is done:
+                break
+            yield item
+        await pumping
+    finally:
+        stop.set()
+        # Nobody awaits pumping after an early exit; fetch its result so a late
+        # error isn't reported as never retrieved
+        pumping.add_done_callback(lambda future: future.cancelled() or future.exception())
+
+# --- Handlers return (status, payload) or (status, payload, extra_headers)
+
+async def register(request):
+    data = request.json()
+    if any(not isinstance(data.get(field), str) for field in ("name", "email", "password")):
+        raise HTTPError(400, "name, email and password must be strings")
+    if not isinstance(data.get("phone"), (str, type(None))):
+        raise HTTPError(400, "phone must be a string")
+    if not data["name"] or not data["email"] or not data["password"]:
+        raise HTTPError(400, "Name, email, and password are required")
+    created = await run_db(database.register_user, data["name"], data["email"],
+                           data.get("phone") or "", data["password"])
+    if not created:
+        raise HTTPError(409, "User with this email already exists")
+    return 201, {"registered": True}
+
+def _check_login(email, password):
+    user = database.get_user_by_email(email)
+    if user and database.verify_password(user['password_hash'], password):
+        return {"id": user['id'], "name": user['name'], "email": user['email']}, issue_token(user)
+    return None, None
+
+async def login(request):
+    data = request.json()
+    email, password = data.get("email", ""), data.get("password", "")
+    if not isinstance(email, str) or not isinstance(password, str):
+        raise HTTPError(400, "email and password must be strings")
+    user, token = await run_db(_check_login, email, password)
+    if not user:
+        raise HTTPError(401, "Invalid email or password")
+    cookie = f"{SESSION_COOKIE}={token}; Max-Age={SESSION_TTL_SECONDS}; Path=/; HttpOnly; Secure; SameSite=Strict"
+    return 200, {"token": token, "user": user}, {"Set-Cookie": cookie}
+
+async def logout(request):
+    await run_db(revoke_token, request.token())
+    return 200, {"logged_out": True}, {"Set-Cookie": f"{SESSION_COOKIE}=; Max-Age=0; Path=/"}
+
+async def get_profile(request):
+    profile = await run_db(database.get_user_profile, request.user["id"])
+    return 200, {"user": request.user, "profile": dict(profile) if profile else None}
+
+async def put_profile(request):
+    await run_db(database.update_user_profile, request.user["id"], request.json())
+    return 200, {"saved": True}
+
+async def get_journal(request):
+    include_content = request.query.get("metadata") != "1"
+    return 200, {"entries": await run_db(database.get_user_journals, request.user["id"], include_content)}
+
+async def post_journal(request):
+    data = request.json()
+    if not isinstance(data.get("content"), str):
+        raise HTTPError(400, "content must be a string")
+    if not data["content"].strip():
+        raise HTTPError(400, "Please write something before saving your entry")
+    entry_data = {
+        "title": data.get("title") or f"Journal Entry - {date.today()}",
+        "content": data["content"],
+        "mood_rating": data.get("mood_rating"),
+        "is_private": data.get("is_private", True),
+        "entry_date": data.get("entry_date") or date.today().isoformat(),
+    }
+    await run_db(database.save_journal_entry, request.user["id"], entry_data)
+    return 201, {"saved": True}
+
+async def get_mood(request):
+    include_notes = request.query.get("metadata") != "1"
+    return 200, {"entries": await run_db(database.get_user_moods, request.user["id"], include_notes)}
+
+async def post_mood(request):
+    data = request.json()
+    fields = ("mood_scale", "energy_level", "anxiety_level", "sleep_quality")
+    if any(not isinstance(data.get(field), int) for field in fields):
+        raise HTTPError(400, f"{', '.join(fields)} must be integers")
+    if not isinstance(data.get("notes"), (str, type(None))):
+        raise HTTPError(400, "notes must be a string")
+    mood_data = {field: data[field] for field in fields}
+    mood_data["notes"] = data.get("notes")
+    mood_data["entry_date"] = data.get("entry_date") or date.today().isoformat()
+    await run_db(database.save_mood_entry, request.user["id"], mood_data)
+    return 201, {"saved": True}
+
+async def get_chat(request):
+    history = await run_db(database.get_chat_history, request.user["id"])
+    return 200, {"history": [{"role": r, "message": m, "timestamp": t} for r, m, t in history]}
+
+async def delete_chat(request):
+    await run_db(database.clear_chat_history, request.user["id"])
+    return 200, {"cleared": True}
+
+async def post_chat(request):
+    message = str(request.json().get("message", "")).strip()
+    if not message:
+        raise HTTPError(400, "Please enter a message")
+    user_id = request.user["id"]
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
+    await run_db(database.save_chat_message, user_id, "user", message, timestamp)
+
+    async def reply():
+        # Save whatever was streamed even if the client disconnects or the
+        # model fails part-way, so the user's message isn't left unanswered
+        parts = []
+        try:
+            async for chunk in iterate_in_thread(mental_health_bot.stream_mental_health_bot, message, user_id):
+                parts.append(chunk)
+                yield chunk
+        finally:
+            if parts:
+                await run_db(database.save_chat_message, user_id, "bot", "".join(parts), timestamp)
+
+    return 200, StreamingResponse(reply())
+
+ROUTES = {
+    ("POST", "/register"): (register, False),
+    ("POST", "/login"): (login, False),
+    ("POST", "/logout"): (logout, True),
+    ("GET", "/profile"): (get_profile, True),
+    ("PUT", "/profile"): (put_profile, True),
+    ("GET", "/journal"): (get_journal, True),
+    ("POST", "/journal"): (post_journal, True),
+    ("GET", "/mood"): (get_mood, True),
+    ("POST", "/mood"): (post_mood, True),
+    ("GET", "/chat"): (get_chat, True),
+    ("POST", "/chat"): (post_chat, True),
+    ("DELETE", "/chat"): (delete_chat, True),
+}
+
+async def authenticate(request):
+    # verify_token reloads the revocation list from the database periodically
+    user = await run_db(verify_token, request.token())
+    if user is None:
+        raise HTTPError(401, "Login required")
+    return user
+
+async def dispatch(request):
+    route = ROUTES.get((request.method, request.path))
+    if route is None:
+        if any(path == request.path for _, path in ROUTES):
+            raise HTTPError(405, "Method not allowed")
+        raise HTTPError(404, "Not found")
+    handler, needs_auth = route
+    if needs_auth:
+        request.user = await authenticate(request)
+    return await handler(request)
+
+# --- HTTP/1.1 plumbing
+
+async def read_request(reader):
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, target, _ = request_line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "Malformed request line")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        length = -1
+    if length < 0:
+        raise HTTPError(400, "Content-Length must be a non-negative integer")
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, "Request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return Request(method.upper(), target, headers, body)
+
+def response_head(status, headers):
+    lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+async def write_response(writer, status, payload, keep_alive, headers=None):
+    connection = "keep-alive" if keep_alive else "close"
+    headers = dict(headers or {})
+    if isinstance(payload, StreamingResponse):
+        headers.update({"Content-Type": payload.content_type, "Transfer-Encoding": "chunked", "Connection": connection})
+        writer.write(response_head(status, headers))
+        try:
+            async for chunk in payload.chunks:
+                data = chunk.encode("utf-8")
+                writer.write(f"{len(data):x}\r\n".encode("latin-1") + data + b"\r\n")
+                await writer.drain()
+        finally:
+            await payload.chunks.aclose()  # run the producer's cleanup now, not at garbage collection
+        writer.write(b"0\r\n\r\n")
+    else:
+        body = json.dumps(payload).encode("utf-8")
+        headers.update({"Content-Type": "application/json", "Content-Length": len(body), "Connection": connection})
+        writer.write(response_head(status, headers))
+        writer.write(body)
+    await writer.drain()
+
+async def handle_connection(reader, writer):
+    try:
+        while True:
+            try:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                keep_alive = request.headers.get("connection", "").lower() != "close"
+                status, payload, *headers = await dispatch(request)
+            except HTTPError as e:
+                keep_alive = False
+                status, payload, headers = e.status, {"error": e.message}, []
+            except Exception:
+                keep_alive = False
+                status, payload, headers = 500, {"error": "Internal server error"}, []
+            await write_response(writer, status, payload, keep_alive, *headers)
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    except Exception:
+        pass  # a streamed body failed after its headers went out; closing without the last chunk marks it incomplete
+    finally:
+        writer.close()
+
+async def serve(host="127.0.0.1", port=8080):
+    server = await asyncio.start_server(handle_connection, host, port)
+    async with server:
+        await server.serve_forever()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MindCare AI HTTP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+    print(f"MindCare AI API listening on http://{args.host}:{args.port}")
+    asyncio.run(serve(args.host, args.port))
@@ -0,0 +1,107 @@
+"""
+Requests per second through the HTTP API versus the Streamlit script path.
+
+    python benchmarks/bench_api.py [clients] [seconds]
+
+The API side runs api_server in-process and drives it with keep-alive
+clients alternating GET /mood and POST /mood. The Streamlit side reruns
+mental_health_app_fixed.py with streamlit's AppTest as a logged-in user,
+which is what every widget interaction costs there. Both use a fresh
+temporary database and the offline LLM stub from loadtest.py.
+"""
+import asyncio
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+
+from loadtest import ROOT, StubLLMClient  # noqa: F401  (also moves into a temp workdir)
+
+import api_server  # noqa: E402
+import database  # noqa: E402
+import mental_health_bot  # noqa: E402
+
+MOOD = {"mood_scale": 6, "energy_level": 5, "anxiety_level": 4, "sleep_quality": 7, "notes": "fine"}
+
+def start_server():
+    ready = threading.Event()
+    state = {}
+
+    async def main():
+        server = await asyncio.start_server(api_server.handle_connection, "127.0.0.1", 0)
+        state["port"] = server.sockets[0].getsockname()[1]
+        ready.set()
+        async with server:
+            await server.serve_forever()
+
+    threading.Thread(target=lambda: asyncio.run(main()), daemon=True).start()
+    ready.wait()
+    return state["port"]
+
+def call(conn, method, path, body=None, token=None):
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    conn.request(method, path, json.dumps(body) if body is not None else None, headers)
+    response = conn.getresponse()
+    data = response.read()
+    return response.status, data
+
+def api_requests_per_second(port, clients, seconds):
+    tokens = []
+    for i in range(clients):
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        call(conn, "POST", "/register", {"name": f"Bench {i}", "email": f"bench{i}@example.com", "password": "pw"})
+        tokens.append(json.loads(call(conn, "POST", "/login", {"email": f"bench{i}@example.com", "password": "pw"})[1])["token"])
+        conn.close()
+
+    counts = [0] * clients
+    deadline = time.perf_counter() + seconds
+
+    def client(slot):
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        while time.perf_counter() < deadline:
+            if counts[slot] % 2:
+                call(conn, "POST", "/mood", MOOD, tokens[slot])
+            else:
+                call(conn, "GET", "/mood?metadata=1", token=tokens[slot])
+            counts[slot] += 1
+        conn.close()
+
+    threads = [threading.Thread(target=client, args=(slot,)) for slot in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / seconds
+
+def streamlit_reruns_per_second(seconds):
+    from streamlit.testing.v1 import AppTest
+
+    database.register_user("Streamlit Bench", "streamlit@example.com", "", "pw")
+    user = database.get_user_by_email("streamlit@example.com")
+    app = AppTest.from_file(os.path.join(ROOT, "mental_health_app_fixed.py"), default_timeout=30)
+    app.session_state["logged_in"] = True
+    app.session_state["user_email"] = user["email"]
+    app.session_state["user_name"] = user["name"]
+    app.session_state["user_id"] = user["id"]
+    app.run()
+
+    runs = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        app.run()
+        runs += 1
+    return runs / seconds
+
+if __name__ == "__main__":
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    mental_health_bot.client = StubLLMClient(800)
+    port = start_server()
+
+    print(f"HTTP API, 1 client:        {api_requests_per_second(port, 1, seconds):8.1f} req/s")
+    print(f"HTTP API, {clients} clients:{' ' * (7 - len(str(clients)))}{api_requests_per_second(port, clients, seconds):8.1f} req/s")
+    print(f"Streamlit script reruns:   {streamlit_reruns_per_second(seconds):8.1f} req/s")
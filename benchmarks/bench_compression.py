@@ -0,0 +1,101 @@
+"""
+Storage size and read throughput of compressed journal/mood bodies on text
+assembled from compression_corpus/heldout.txt.
+
+    python benchmarks/bench_compression.py [users] [entries_per_user]
+
+Each run uses a fresh temporary directory, so the real database is untouched.
+"""
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+import zlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+WORKDIR = tempfile.mkdtemp(prefix="mindcare_bench_")
+os.chdir(WORKDIR)
+
+import compression  # noqa: E402
+import database  # noqa: E402
+
+# Held-out text only: the preset dictionary was trained on train.txt, so
+# benchmarking on it would overstate the savings
+HELDOUT = compression.read_corpus(os.path.join(ROOT, "compression_corpus", "heldout.txt"))
+SENTENCES = [sentence for entry in HELDOUT for sentence in re.split(r"(?<=[.!?]) ", entry)]
+
+def synthetic_text(rng, sentences):
+    return " ".join(rng.choice(SENTENCES) for _ in range(sentences))
+
+def dictionary_gain():
+    """
+    Compressed size of the held-out entries without and with the preset
+    dictionary
+    """
+    plain = packed = 0
+    for entry in HELDOUT:
+        raw = entry.encode("utf-8")
+        plain += len(zlib.compress(raw, compression.COMPRESS_LEVEL))
+        compressor = zlib.compressobj(compression.COMPRESS_LEVEL, zdict=compression.PRESET_DICTIONARY_V1)
+        packed += len(compressor.compress(raw) + compressor.flush())
+    return plain, packed
+
+def build(path, users, entries, compress):
+    database.DB_NAME = path
+    database.SHARD_COUNT = 1
+    database.create_tables()
+    original = database.compress_text
+    if not compress:
+        database.compress_text = lambda text: text
+    rng = random.Random(42)
+    try:
+        for user_id in range(1, users + 1):
+            for _ in range(entries):
+                database.save_journal_entry(user_id, {
+                    "title": "Entry", "content": synthetic_text(rng, rng.randint(4, 30)),
+                    "mood_rating": rng.randint(1, 10), "entry_date": "2024-01-01",
+                })
+                database.save_mood_entry(user_id, {
+                    "mood_scale": 5, "energy_level": 5, "anxiety_level": 5, "sleep_quality": 5,
+                    "notes": synthetic_text(rng, rng.randint(1, 6)), "entry_date": "2024-01-01",
+                })
+    finally:
+        database.compress_text = original
+    conn = database.get_db_connection()
+    conn.execute("VACUUM")
+    conn.close()
+    return os.path.getsize(path)
+
+def reads_per_second(path, users, include_bodies=True):
+    database.DB_NAME = path
+    start = time.perf_counter()
+    for user_id in range(1, users + 1):
+        database.get_user_journals(user_id, include_content=include_bodies)
+        database.get_user_moods(user_id, include_notes=include_bodies)
+    return users / (time.perf_counter() - start)
+
+if __name__ == "__main__":
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    entries = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    raw_path = os.path.join(WORKDIR, "raw.db")
+    packed_path = os.path.join(WORKDIR, "compressed.db")
+
+    raw_size = build(raw_path, users, entries, compress=False)
+    packed_size = build(packed_path, users, entries, compress=True)
+    print(f"{users} users x {entries} journal + mood entries, threshold {compression.COMPRESS_THRESHOLD} bytes")
+    print(f"database size: raw {raw_size / 1024:.0f} KiB, compressed {packed_size / 1024:.0f} KiB "
+          f"({100 * (1 - packed_size / raw_size):.1f}% smaller)")
+
+    plain, packed = dictionary_gain()
+    print(f"held-out entries: zlib {plain} bytes, zlib + preset dictionary {packed} bytes "
+          f"({100 * (1 - packed / plain):.1f}% smaller)")
+
+    raw_full = reads_per_second(raw_path, users)
+    packed_full = reads_per_second(packed_path, users)
+    packed_meta = reads_per_second(packed_path, users, include_bodies=False)
+    print(f"full history reads/s:  raw {raw_full:.0f}, compressed {packed_full:.0f}")
+    print(f"metadata-only reads/s: compressed {packed_meta:.0f} (no bodies decompressed)")
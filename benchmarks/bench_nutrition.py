@@ -0,0 +1,70 @@
+"""
+Load, search and meal-total timings for the nutrition engine on a synthetic
+food table.
+
+    python benchmarks/bench_nutrition.py [foods] [logged_items]
+"""
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import nutrition  # noqa: E402
+
+WORDS = ["apple", "banana", "rice", "chicken", "paneer", "egg", "oats", "milk", "poha", "lentil",
+         "spinach", "yogurt", "bread", "tofu", "salmon", "almond", "peanut", "curry", "soup", "salad"]
+STYLES = ["boiled", "fried", "grilled", "raw", "steamed", "baked", "roasted", "spicy", "sweet", "plain"]
+
+def write_csv(path, foods):
+    rng = random.Random(7)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["food", *nutrition.MACRO_COLUMNS])
+        for i in range(foods):
+            name = f"{rng.choice(STYLES)} {rng.choice(WORDS)} {rng.choice(WORDS)} #{i}"
+            writer.writerow([name, rng.randint(20, 800), rng.uniform(0, 40), rng.uniform(0, 90), rng.uniform(0, 40)])
+
+def timed(label, fn, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{label:<34} {elapsed * 1000:10.2f} ms")
+    return result
+
+if __name__ == "__main__":
+    foods = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    items = int(sys.argv[2]) if len(sys.argv) > 2 else 1000000
+    workdir = tempfile.mkdtemp(prefix="mindcare_bench_")
+    csv_path = os.path.join(workdir, "foods.csv")
+    write_csv(csv_path, foods)
+    print(f"{foods} foods, {items} logged items")
+
+    timed("cold load (CSV + index build)", lambda: nutrition.load_food_table(csv_path))
+    table = timed("warm load (.npz cache)", lambda: nutrition.load_food_table(csv_path))
+    timed("prefix_search('grilled sal')", lambda: table.prefix_search("grilled sal"), repeat=100)
+    timed("fuzzy_search('grild salmn')", lambda: table.fuzzy_search("grild salmn"), repeat=20)
+
+    rng = np.random.default_rng(0)
+    n_meals = items // 5
+    meal_ids = rng.integers(0, n_meals, items)
+    food_indices = rng.integers(0, foods, items)
+    quantities = rng.uniform(0.5, 2.0, items)
+    totals = timed("meal_totals (vectorized)", lambda: table.meal_totals(meal_ids, food_indices, quantities, n_meals))
+    timed("daily_macros (vectorized)", lambda: table.daily_macros(np.arange(n_meals) // 4, totals))
+
+    def python_loop():
+        out = [[0.0] * 4 for _ in range(n_meals)]
+        for meal, food, qty in zip(meal_ids.tolist(), food_indices.tolist(), quantities.tolist()):
+            row = table.macros[food]
+            for column in range(4):
+                out[meal][column] += row[column] * qty
+        return out
+    timed("meal_totals (per-item Python loop)", python_loop)
@@ -0,0 +1,68 @@
+"""
+Write throughput of save_mood_entry / save_journal_entry versus shard count.
+
+    python benchmarks/bench_shard_writes.py [writers] [seconds]
+
+Each run uses a fresh temporary directory, so the real database is untouched.
+"""
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+WORKDIR = tempfile.mkdtemp(prefix="mindcare_bench_")
+os.chdir(WORKDIR)
+
+import database  # noqa: E402  (creates its tables in WORKDIR)
+
+def run(shard_count: int, writers: int, seconds: float):
+    run_dir = tempfile.mkdtemp(dir=WORKDIR)
+    database.DB_NAME = os.path.join(run_dir, "global.db")
+    database.SHARD_DIR = run_dir
+    database.SHARD_COUNT = shard_count
+    database.create_tables()
+
+    done = [0] * writers
+    errors = [0] * writers
+    deadline = time.perf_counter() + seconds
+
+    def writer(slot):
+        rng = random.Random(slot)
+        while time.perf_counter() < deadline:
+            user_id = rng.randint(1, 10000)
+            try:
+                if rng.random() < 0.5:
+                    database.save_mood_entry(user_id, {
+                        "mood_scale": 5, "energy_level": 5, "anxiety_level": 5,
+                        "sleep_quality": 5, "notes": "benchmark", "entry_date": "2024-01-01",
+                    })
+                else:
+                    database.save_journal_entry(user_id, {
+                        "title": "benchmark", "content": "x" * 500,
+                        "mood_rating": 5, "entry_date": "2024-01-01",
+                    })
+                done[slot] += 1
+            except Exception:
+                errors[slot] += 1
+
+    threads = [threading.Thread(target=writer, args=(slot,)) for slot in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(done) / seconds, sum(errors)
+
+if __name__ == "__main__":
+    writers = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    print(f"{writers} writer threads, {seconds:.0f}s per run")
+    baseline = None
+    for shard_count in (1, 2, 4, 8):
+        throughput, errors = run(shard_count, writers, seconds)
+        baseline = baseline or throughput
+        print(f"shards={shard_count:<2} writes/s={throughput:9.1f} speedup={throughput / baseline:5.2f}x errors={errors}")
@@ -0,0 +1,273 @@
+"""
+Concurrent end-to-end load test against the real database layer.
+
+    python benchmarks/loadtest.py benchmarks/scenarios/baseline.json [--out results/]
+
+Each simulated session registers, logs in through verify_password, then runs
+a weighted mix of mood/journal saves, history reads and chat turns. The LLM
+client is replaced by an offline stub with the scenario's latency, so runs
+are reproducible and cost nothing. Every run uses a fresh temporary
+database.
+
+LLM calls go through their own scheduler: per-user quotas are off unless the
+scenario sets "llm_quotas": true, and "llm_concurrency" sets the global cap.
+Chat turns answered with the scheduler's quota fallback are counted in a
+separate "quota" column. Latency percentiles cover successful operations
+only; quota fallbacks and errors are counted but not timed.
+
+Scenarios are JSON files carrying a "name" and an integer "version"; bump the
+version whenever the workload changes so results are only compared between
+releases when they were produced by the same scenario. Results are printed
+and written as JSON tagged with the scenario name, version and git revision.
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import date, datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+LAUNCH_DIR = os.getcwd()
+WORKDIR = tempfile.mkdtemp(prefix="mindcare_load_")
+os.chdir(WORKDIR)
+
+import database  # noqa: E402
+import llm_scheduler  # noqa: E402
+import mental_health_bot  # noqa: E402
+
+REQUIRED_KEYS = ("name", "version", "sessions", "concurrency", "actions_per_session", "mix")
+WRITE_PREFIXES = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+
+_lock_wait = threading.local()
+
+class QuotaFallback(Exception):
+    pass
+
+class LockTimingCursor(sqlite3.Cursor):
+    def execute(self, sql, parameters=()):
+        # Take the write lock explicitly so the time spent waiting for it can
+        # be told apart from the time spent executing the statement
+        if not self.connection.in_transaction and sql.lstrip().upper().startswith(WRITE_PREFIXES):
+            start = time.perf_counter()
+            super().execute("BEGIN IMMEDIATE")
+            _lock_wait.seconds = getattr(_lock_wait, "seconds", 0.0) + time.perf_counter() - start
+        return super().execute(sql, parameters)
+
+class LockTimingConnection(sqlite3.Connection):
+    def cursor(self, factory=LockTimingCursor):
+        return super().cursor(factory)
+
+class StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+class StubLLMClient:
+    """
+    Stands in for genai.Client: sleeps for the configured latency and echoes
+    a fixed-size reply
+    """
+    def __init__(self, latency_ms: float, jitter_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.models = self
+
+    def generate_content(self, model, contents):
+        time.sleep(max(0.0, self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000)
+        return StubResponse("Thank you for sharing. " * 20)
+
+    def generate_content_stream(self, model, contents):
+        for _ in range(4):
+            time.sleep(max(0.0, self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)) / 4000)
+            yield StubResponse("Thank you for sharing. " * 5)
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.attempts = defaultdict(int)
+        self.latencies = defaultdict(list)
+        self.lock_waits = defaultdict(float)
+        self.errors = defaultdict(int)
+        self.quota_fallbacks = defaultdict(int)
+
+    def run(self, operation, fn, *args):
+        _lock_wait.seconds = 0.0
+        start = time.perf_counter()
+        failures = None
+        try:
+            result = fn(*args)
+        except QuotaFallback:
+            failures, result = self.quota_fallbacks, None
+        except Exception:
+            failures, result = self.errors, None
+        elapsed = time.perf_counter() - start
+        with self.lock:
+            self.attempts[operation] += 1
+            self.lock_waits[operation] += _lock_wait.seconds
+            if failures is None:
+                self.latencies[operation].append(elapsed)
+            else:
+                failures[operation] += 1
+        return result
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+def login(email, password):
+    user = database.get_user_by_email(email)
+    if not user or not database.verify_password(user['password_hash'], password):
+        raise ValueError("login failed")
+    return user['id']
+
+def chat(user_id, message):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
+    database.save_chat_message(user_id, "user", message, timestamp)
+    reply = mental_health_bot.ask_mental_health_bot(message, user_id)
+    if reply == mental_health_bot.CHAT_QUOTA_FALLBACK:
+        raise QuotaFallback()
+    if reply == mental_health_bot.CHAT_FALLBACK:
+        raise RuntimeError("LLM call failed")
+    database.save_chat_message(user_id, "bot", reply, timestamp)
+    return reply
+
+def read_history(user_id):
+    database.get_user_journals(user_id)
+    database.get_user_moods(user_id)
+    database.get_chat_history(user_id)
+
+def run_session(scenario, session_id, recorder, rng):
+    email = f"load-{session_id}@example.com"
+    password = f"password-{session_id}"
+    recorder.run("register", database.register_user, f"Load User {session_id}", email, "", password)
+    user_id = recorder.run("login", login, email, password)
+    if user_id is None:
+        return
+
+    operations = {
+        "save_mood": lambda: database.save_mood_entry(user_id, {
+            "mood_scale": rng.randint(1, 10), "energy_level": rng.randint(1, 10),
+            "anxiety_level": rng.randint(1, 10), "sleep_quality": rng.randint(1, 10),
+            "notes": "Felt okay today. " * rng.randint(0, 20), "entry_date": date.today().isoformat(),
+        }),
+        "save_journal": lambda: database.save_journal_entry(user_id, {
+            "title": "Load test entry", "content": "Today I wrote a little. " * rng.randint(5, 80),
+            "mood_rating": rng.randint(1, 10), "entry_date": date.today().isoformat(),
+        }),
+        "read_history": lambda: read_history(user_id),
+        "chat": lambda: chat(user_id, "I have been feeling stressed about work lately."),
+    }
+    names = list(scenario["mix"])
+    weights = [scenario["mix"][name] for name in names]
+    think_time = scenario.get("think_time_ms", 0) / 1000
+    for _ in range(scenario["actions_per_session"]):
+        name = rng.choices(names, weights)[0]
+        recorder.run(name, operations[name])
+        if think_time:
+            time.sleep(rng.uniform(0, 2 * think_time))
+
+def load_scenario(path):
+    with open(path, encoding="utf-8") as f:
+        scenario = json.load(f)
+    missing = [key for key in REQUIRED_KEYS if key not in scenario]
+    if missing:
+        raise ValueError(f"Scenario {path} is missing {', '.join(missing)}")
+    return scenario
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def run_scenario(scenario):
+    database.DB_NAME = os.path.join(WORKDIR, f"{scenario['name']}.db")
+    database.SHARD_DIR = WORKDIR
+    database.SHARD_COUNT = scenario.get("shard_count", 1)
+    database.CONNECTION_FACTORY = LockTimingConnection
+    database.create_tables()
+    mental_health_bot.client = StubLLMClient(scenario.get("llm_latency_ms", 800), scenario.get("llm_jitter_ms", 0))
+    unlimited = {priority: (float("inf"), 0.0) for priority in llm_scheduler.BUCKETS}
+    mental_health_bot.scheduler = llm_scheduler.LLMScheduler(
+        max_concurrency=scenario.get("llm_concurrency", llm_scheduler.MAX_CONCURRENCY),
+        buckets=None if scenario.get("llm_quotas", False) else unlimited,
+    )
+
+    recorder = Recorder()
+    next_session = iter(range(scenario["sessions"]))
+    next_lock = threading.Lock()
+
+    def worker(slot):
+        rng = random.Random(scenario.get("seed", 0) * 1000 + slot)
+        while True:
+            with next_lock:
+                session_id = next(next_session, None)
+            if session_id is None:
+                return
+            run_session(scenario, session_id, recorder, rng)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(slot,)) for slot in range(scenario["concurrency"])]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    operations = {}
+    for name, attempts in sorted(recorder.attempts.items()):
+        latencies = sorted(recorder.latencies[name])
+        operations[name] = {
+            "count": attempts,
+            "throughput_per_s": attempts / wall,
+            "p50_ms": percentile(latencies, 0.50) * 1000,
+            "p95_ms": percentile(latencies, 0.95) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000,
+            "lock_wait_ms_total": recorder.lock_waits[name] * 1000,
+            "error_rate": recorder.errors[name] / attempts,
+            "quota_fallback_rate": recorder.quota_fallbacks[name] / attempts,
+        }
+    total = sum(op["count"] for op in operations.values())
+    return {
+        "scenario": scenario["name"],
+        "scenario_version": scenario["version"],
+        "git_revision": git_revision(),
+        "run_at": datetime.now().isoformat(timespec="seconds"),
+        "wall_time_s": wall,
+        "throughput_per_s": total / wall,
+        "operations": operations,
+    }
+
+def print_report(result):
+    print(f"{result['scenario']} v{result['scenario_version']} @ {result['git_revision']}: "
+          f"{result['throughput_per_s']:.1f} ops/s over {result['wall_time_s']:.1f}s")
+    print(f"{'operation':<14}{'count':>7}{'ops/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'lock ms':>10}{'errors':>8}{'quota':>8}")
+    for name, op in result["operations"].items():
+        print(f"{name:<14}{op['count']:>7}{op['throughput_per_s']:>9.1f}{op['p50_ms']:>9.1f}{op['p95_ms']:>9.1f}"
+              f"{op['p99_ms']:>9.1f}{op['lock_wait_ms_total']:>10.1f}{op['error_rate']:>8.1%}{op['quota_fallback_rate']:>8.1%}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("scenario", help="path to a scenario JSON file")
+    parser.add_argument("--out", help="directory to write the JSON result into")
+    args = parser.parse_args()
+
+    result = run_scenario(load_scenario(os.path.join(LAUNCH_DIR, args.scenario)))
+    print_report(result)
+    if args.out:
+        out_dir = os.path.join(LAUNCH_DIR, args.out)
+        os.makedirs(out_dir, exist_ok=True)
+        out_path = os.path.join(out_dir, f"{result['scenario']}-v{result['scenario_version']}-{result['git_revision']}.json")
+        with open(out_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"Wrote {out_path}")
@@ -0,0 +1,118 @@
+"""
+Transparent compression for long journal content and mood notes.
+
+Short text is stored as plain TEXT, exactly as before. Text longer than
+COMPRESS_THRESHOLD bytes is stored as a BLOB whose first byte says how the
+rest was encoded, so old rows keep working and new dictionaries can be added
+later without rewriting the table:
+
+    0x01  zlib stream
+    0x02  zlib stream with PRESET_DICTIONARY_V1
+
+Dictionaries are built with train_dictionary() from a sample corpus and
+checked in as binary files:
+
+    python compression.py train compression_corpus/train.txt compression_dict_v1.bin
+
+compression_corpus/train.txt is hand-written, one entry per line, because
+real user entries cannot be shared; compression_corpus/heldout.txt is kept
+out of training so benchmarks measure text the dictionary has not seen. A
+dictionary must never change once rows have been written with it; to ship a
+better one, train it on new samples and register it under a new header byte.
+"""
+import os
+import re
+import sys
+import zlib
+from collections import Counter
+
+COMPRESS_THRESHOLD = 200
+COMPRESS_LEVEL = 6
+
+HEADER_ZLIB = 0x01
+HEADER_ZLIB_DICT_V1 = 0x02
+
+DICTIONARY_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def load_dictionary(name):
+    with open(os.path.join(DICTIONARY_DIR, name), "rb") as f:
+        return f.read()
+
+# Generated from compression_corpus/train.txt with
+#   python compression.py train compression_corpus/train.txt compression_dict_v1.bin
+PRESET_DICTIONARY_V1 = load_dictionary("compression_dict_v1.bin")
+
+DICTIONARIES = {
+    HEADER_ZLIB_DICT_V1: PRESET_DICTIONARY_V1,
+}
+CURRENT_HEADER = HEADER_ZLIB_DICT_V1
+
+def compress_text(text):
+    """
+    Return text unchanged when it is short, otherwise a header-tagged BLOB
+    """
+    if text is None:
+        return None
+    raw = text.encode("utf-8")
+    if len(raw) < COMPRESS_THRESHOLD:
+        return text
+    compressor = zlib.compressobj(COMPRESS_LEVEL, zdict=DICTIONARIES[CURRENT_HEADER])
+    packed = bytes([CURRENT_HEADER]) + compressor.compress(raw) + compressor.flush()
+    if len(packed) >= len(raw):
+        return text
+    return packed
+
+def decompress_text(value):
+    """
+    Inverse of compress_text; plain TEXT values are returned as-is
+    """
+    if value is None or isinstance(value, str):
+        return value
+    header, payload = value[0], value[1:]
+    if header == HEADER_ZLIB:
+        return zlib.decompress(payload).decode("utf-8")
+    if header in DICTIONARIES:
+        decompressor = zlib.decompressobj(zdict=DICTIONARIES[header])
+        return (decompressor.decompress(payload) + decompressor.flush()).decode("utf-8")
+    raise ValueError(f"Unknown compression header byte: {header:#04x}")
+
+def train_dictionary(samples, size: int = 2048) -> bytes:
+    """
+    Build a zlib preset dictionary from a sample corpus by keeping the word
+    n-grams that save the most bytes, ordered least to most valuable
+    """
+    counts = Counter()
+    for sample in samples:
+        words = re.findall(r"\S+", sample)
+        for n in (1, 2, 3, 4):
+            for i in range(len(words) - n + 1):
+                counts[" ".join(words[i:i + n])] += 1
+
+    scored = sorted(
+        ((count * len(phrase), phrase) for phrase, count in counts.items() if count > 1 and len(phrase) > 3),
+        reverse=True,
+    )
+    chosen, used = [], 0
+    for _, phrase in scored:
+        if any(phrase in kept for kept in chosen):
+            continue
+        encoded = len(phrase.encode("utf-8")) + 1
+        if used + encoded > size:
+            continue
+        chosen.append(phrase)
+        used += encoded
+    return " ".join(reversed(chosen)).encode("utf-8")
+
+def read_corpus(path):
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "train":
+        dictionary = train_dictionary(read_corpus(sys.argv[2]))
+        with open(sys.argv[3], "wb") as f:
+            f.write(dictionary)
+        print(f"Wrote {len(dictionary)} byte dictionary to {sys.argv[3]}")
+    else:
+        print(__doc__)
+        sys.exit(1)
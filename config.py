@@ -1,2 +1,9 @@
 # config.py
+import os
+
 GEMINI_API_KEY= "your-api-key-here"
+
+# Key for signing session tokens. Leave empty to have sessions.py generate one
+# and keep it in session_secret.key; set it explicitly when several servers
+# must accept each other's tokens.
+SESSION_SECRET = os.environ.get("MINDCARE_SESSION_SECRET", "")
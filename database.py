@@ -2,13 +2,119 @@ import sqlite3
 import hashlib
 import os
 
+from compression import compress_text, decompress_text
+
 DB_NAME = "nutrition_planner.db"
 
+# Per-user tables (profiles, journals, moods, chat history) live in SHARD_COUNT
+# SQLite files so writes from different users do not contend for one lock.
+# With a single shard everything stays in DB_NAME, as before.
+SHARD_COUNT = int(os.environ.get("MINDCARE_SHARD_COUNT", "1"))
+SHARD_DIR = os.environ.get("MINDCARE_SHARD_DIR", ".")
+
+# Connection class used for every connection; the load-testing harness swaps
+# in a subclass that records lock-wait time
+CONNECTION_FACTORY = sqlite3.Connection
+
+USER_TABLES = {
+    "user_profiles": """
+    CREATE TABLE IF NOT EXISTS user_profiles (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        age INTEGER,
+        gender TEXT,
+        height INTEGER,
+        weight INTEGER,
+        activity_level TEXT,
+        medical_conditions TEXT,
+        food_preferences TEXT,
+        allergies TEXT,
+        health_goal TEXT,
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )
+    """,
+    "journal_entries": """
+    CREATE TABLE IF NOT EXISTS journal_entries (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        title TEXT,
+        content TEXT NOT NULL,
+        mood_rating INTEGER,
+        is_private BOOLEAN DEFAULT 1,
+        entry_date TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )
+    """,
+    "mood_entries": """
+    CREATE TABLE IF NOT EXISTS mood_entries (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        mood_scale INTEGER NOT NULL,
+        energy_level INTEGER NOT NULL,
+        anxiety_level INTEGER NOT NULL,
+        sleep_quality INTEGER NOT NULL,
+        notes TEXT,
+        entry_date TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )
+    """,
+    "chat_messages": """
+    CREATE TABLE IF NOT EXISTS chat_messages (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        role TEXT NOT NULL,
+        message TEXT NOT NULL,
+        timestamp TEXT NOT NULL,
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )
+    """,
+}
+
 def get_db_connection():
-    conn = sqlite3.connect(DB_NAME)
+    conn = sqlite3.connect(DB_NAME, factory=CONNECTION_FACTORY)
     conn.row_factory = sqlite3.Row
     return conn
 
+def shard_for_user(user_id: int, shard_count: int = None) -> int:
+    """
+    Map a user id to a shard with jump consistent hashing, so growing from
+    n to n+1 shards only moves about 1/(n+1) of the users
+    """
+    if shard_count is None:
+        shard_count = SHARD_COUNT
+    key = int.from_bytes(hashlib.blake2b(str(user_id).encode(), digest_size=8).digest(), "big")
+    b, j = -1, 0
+    while j < shard_count:
+        b = j
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        j = int((b + 1) * (float(1 << 31) / float((key >> 33) + 1)))
+    return b
+
+def shard_path(index: int, shard_count: int = None) -> str:
+    if shard_count is None:
+        shard_count = SHARD_COUNT
+    if shard_count == 1:
+        return DB_NAME
+    # File names do not depend on the shard count, so growing from n to m
+    # shards leaves shards 0..n-1 in place and only moves the users that
+    # jump consistent hashing reassigns
+    return os.path.join(SHARD_DIR, f"mindcare_shard_{index}.db")
+
+def get_shard_connection(user_id: int):
+    conn = sqlite3.connect(shard_path(shard_for_user(user_id)), factory=CONNECTION_FACTORY)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+def create_shard_tables(path: str):
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    for ddl in USER_TABLES.values():
+        cursor.execute(ddl)
+    conn.commit()
+    conn.close()
+
 def create_tables():
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -22,23 +128,18 @@ def create_tables():
     )
     """)
     cursor.execute("""
-    CREATE TABLE IF NOT EXISTS user_profiles (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
+    CREATE TABLE IF NOT EXISTS sessions (
+        id TEXT PRIMARY KEY,
         user_id INTEGER NOT NULL,
-        age INTEGER,
-        gender TEXT,
-        height INTEGER,
-        weight INTEGER,
-        activity_level TEXT,
-        medical_conditions TEXT,
-        food_preferences TEXT,
-        allergies TEXT,
-        health_goal TEXT,
+        expires_at INTEGER NOT NULL,
+        revoked BOOLEAN DEFAULT 0,
         FOREIGN KEY (user_id) REFERENCES users (id)
     )
     """)
     conn.commit()
     conn.close()
+    for index in range(SHARD_COUNT):
+        create_shard_tables(shard_path(index))
 
 def hash_password(password: str) -> str:
     salt = os.urandom(32)  # 32 bytes salt
@@ -73,9 +174,43 @@ def get_user_by_email(email: str):
     conn.close()
     return user
 
-def save_user_profile(user_id: int, profile: dict):
+def create_session(session_id: str, user_id: int, expires_at: int):
     conn = get_db_connection()
     cursor = conn.cursor()
+    cursor.execute("INSERT INTO sessions (id, user_id, expires_at) VALUES (?, ?, ?)",
+                   (session_id, user_id, expires_at))
+    conn.commit()
+    conn.close()
+
+def revoke_session(session_id: str):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("UPDATE sessions SET revoked = 1 WHERE id = ?", (session_id,))
+    conn.commit()
+    conn.close()
+
+def get_revoked_sessions(now: int):
+    """
+    Ids of revoked sessions that have not expired yet; expired ones are
+    rejected by their expiry time alone
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT id FROM sessions WHERE revoked = 1 AND expires_at > ?", (now,))
+    revoked = {row['id'] for row in cursor.fetchall()}
+    conn.close()
+    return revoked
+
+def delete_expired_sessions(now: int):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+    conn.commit()
+    conn.close()
+
+def save_user_profile(user_id: int, profile: dict):
+    conn = get_shard_connection(user_id)
+    cursor = conn.cursor()
     cursor.execute("""
     INSERT OR REPLACE INTO user_profiles (user_id, age, gender, height, weight, activity_level, medical_conditions, food_preferences, allergies, health_goal)
     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
@@ -95,12 +230,161 @@ def save_user_profile(user_id: int, profile: dict):
     conn.close()
 
 def get_user_profile(user_id: int):
-    conn = get_db_connection()
+    conn = get_shard_connection(user_id)
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM user_profiles WHERE user_id = ?", (user_id,))
     profile = cursor.fetchone()
     conn.close()
     return profile
 
+def update_user_profile(user_id: int, profile: dict):
+    conn = get_shard_connection(user_id)
+    cursor = conn.cursor()
+
+    # Check if profile exists
+    cursor.execute("SELECT id FROM user_profiles WHERE user_id = ?", (user_id,))
+    existing = cursor.fetchone()
+
+    if existing:
+        cursor.execute("""
+        UPDATE user_profiles SET
+        age = ?, gender = ?, activity_level = ?, medical_conditions = ?,
+        food_preferences = ?, allergies = ?, health_goal = ?
+        WHERE user_id = ?
+        """, (
+            profile.get("age"),
+            profile.get("gender"),
+            profile.get("activity_level", profile.get("occupation")),  # Reuse field
+            profile.get("medical_conditions", profile.get("mental_health_concerns")),
+            profile.get("food_preferences", profile.get("support_preferences")),
+            profile.get("allergies", profile.get("stress_level")),  # Reuse field
+            profile.get("health_goal", "Mental Wellness"),
+            user_id
+        ))
+    else:
+        cursor.execute("""
+        INSERT INTO user_profiles (user_id, age, gender, activity_level, medical_conditions, food_preferences, allergies, health_goal)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            user_id,
+            profile.get("age"),
+            profile.get("gender"),
+            profile.get("activity_level", profile.get("occupation")),
+            profile.get("medical_conditions", profile.get("mental_health_concerns")),
+            profile.get("food_preferences", profile.get("support_preferences")),
+            profile.get("allergies", profile.get("stress_level")),
+            profile.get("health_goal", "Mental Wellness")
+        ))
+
+    conn.commit()
+    conn.close()
+
+# Database functions for mental health features
+def save_journal_entry(user_id: int, entry_data: dict):
+    conn = get_shard_connection(user_id)
+    cursor = conn.cursor()
+    cursor.execute("""
+    INSERT INTO journal_entries (user_id, title, content, mood_rating, is_private, entry_date)
+    VALUES (?, ?, ?, ?, ?, ?)
+    """, (
+        user_id,
+        entry_data.get("title"),
+        compress_text(entry_data.get("content")),
+        entry_data.get("mood_rating"),
+        entry_data.get("is_private", True),
+        entry_data.get("entry_date")
+    ))
+    conn.commit()
+    conn.close()
+
+JOURNAL_METADATA_COLUMNS = "id, user_id, title, mood_rating, is_private, entry_date, created_at"
+MOOD_METADATA_COLUMNS = "id, user_id, mood_scale, energy_level, anxiety_level, sleep_quality, entry_date, created_at"
+
+def get_user_journals(user_id: int, include_content: bool = True, limit: int = None):
+    """
+    Newest first. With include_content=False only titles, dates and ratings
+    are read and no entry body is decompressed
+    """
+    columns = "*" if include_content else JOURNAL_METADATA_COLUMNS
+    conn = get_shard_connection(user_id)
+    cursor = conn.cursor()
+    cursor.execute(f"""
+    SELECT {columns} FROM journal_entries
+    WHERE user_id = ?
+    ORDER BY created_at DESC, id DESC
+    LIMIT ?
+    """, (user_id, -1 if limit is None else limit))
+    journals = [dict(row) for row in cursor.fetchall()]
+    conn.close()
+    if include_content:
+        for journal in journals:
+            journal['content'] = decompress_text(journal['content'])
+    return journals
+
+def save_mood_entry(user_id: int, mood_data: dict):
+    conn = get_shard_connection(user_id)
+    cursor = conn.cursor()
+    cursor.execute("""
+    INSERT INTO mood_entries (user_id, mood_scale, energy_level, anxiety_level, sleep_quality, notes, entry_date)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, (
+        user_id,
+        mood_data.get("mood_scale"),
+        mood_data.get("energy_level"),
+        mood_data.get("anxiety_level"),
+        mood_data.get("sleep_quality"),
+        compress_text(mood_data.get("notes")),
+        mood_data.get("entry_date")
+    ))
+    conn.commit()
+    conn.close()
+
+def get_user_moods(user_id: int, include_notes: bool = True, limit: int = None):
+    """
+    Newest first. With include_notes=False only the ratings and dates are read
+    """
+    columns = "*" if include_notes else MOOD_METADATA_COLUMNS
+    conn = get_shard_connection(user_id)
+    cursor = conn.cursor()
+    cursor.execute(f"""
+    SELECT {columns} FROM mood_entries
+    WHERE user_id = ?
+    ORDER BY created_at DESC, id DESC
+    LIMIT ?
+    """, (user_id, -1 if limit is None else limit))
+    moods = [dict(row) for row in cursor.fetchall()]
+    conn.close()
+    if include_notes:
+        for mood in moods:
+            mood['notes'] = decompress_text(mood['notes'])
+    return moods
+
+def save_chat_message(user_id: int, role: str, message: str, timestamp: str):
+    conn = get_shard_connection(user_id)
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO chat_messages (user_id, role, message, timestamp) VALUES (?, ?, ?, ?)",
+                   (user_id, role, message, timestamp))
+    conn.commit()
+    conn.close()
+
+def get_chat_history(user_id: int):
+    conn = get_shard_connection(user_id)
+    cursor = conn.cursor()
+    cursor.execute("""
+    SELECT role, message, timestamp FROM chat_messages
+    WHERE user_id = ?
+    ORDER BY id
+    """, (user_id,))
+    history = [(row['role'], row['message'], row['timestamp']) for row in cursor.fetchall()]
+    conn.close()
+    return history
+
+def clear_chat_history(user_id: int):
+    conn = get_shard_connection(user_id)
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM chat_messages WHERE user_id = ?", (user_id,))
+    conn.commit()
+    conn.close()
+
 # Initialize database tables on import
 create_tables()
@@ -0,0 +1,140 @@
+"""
+Fair scheduling and quotas for calls to the Gemini API.
+
+Every call from mental_health_bot goes through scheduler.slot():
+
+- each (user, priority class) pair has a token bucket; an empty bucket
+  raises QuotaExceeded immediately, and the bot answers with its local
+  fallback instead of queueing behind upstream capacity
+- at most MAX_CONCURRENCY calls are in flight across all users
+- waiting calls are admitted by priority class (interactive chat, then tips
+  and insights, then batch work) and first-come-first-served within a class
+- prompt/response tokens and estimated cost are accounted per user
+"""
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+INTERACTIVE = 0   # chat replies the user is waiting on
+INSIGHTS = 1      # wellness tips, mood insights, journal reflections
+BATCH = 2         # speculative or background work
+
+MAX_CONCURRENCY = int(os.environ.get("MINDCARE_LLM_CONCURRENCY", "8"))
+
+# priority -> (burst capacity, refill per second)
+BUCKETS = {
+    INTERACTIVE: (6, 1 / 5),
+    INSIGHTS: (4, 1 / 60),
+    BATCH: (2, 1 / 300),
+}
+
+# USD per million tokens, for the per-user cost estimate
+PROMPT_TOKEN_COST = 0.10
+RESPONSE_TOKEN_COST = 0.40
+
+class QuotaExceeded(Exception):
+    pass
+
+class TokenBucket:
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def try_take(self, amount: float = 1.0) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_per_second)
+        self.updated_at = now
+        if self.tokens < amount:
+            return False
+        self.tokens -= amount
+        return True
+
+def estimate_tokens(text: str) -> int:
+    return len(text or "") // 4 + 1
+
+class LLMScheduler:
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY, buckets: dict = None):
+        self.max_concurrency = max_concurrency
+        self.bucket_settings = buckets or BUCKETS
+        self._buckets = {}
+        self._usage = defaultdict(lambda: {"calls": 0, "rejected": 0, "prompt_tokens": 0,
+                                           "response_tokens": 0, "cost_usd": 0.0})
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._active = 0
+        self._waiting = []
+        self._sequence = itertools.count()
+
+    def _take_quota(self, user_id, priority):
+        if user_id is None:
+            return
+        with self._lock:
+            bucket = self._buckets.get((user_id, priority))
+            if bucket is None:
+                bucket = self._buckets[(user_id, priority)] = TokenBucket(*self.bucket_settings[priority])
+            if not bucket.try_take():
+                self._usage[user_id]["rejected"] += 1
+                raise QuotaExceeded(f"LLM quota exceeded for user {user_id}")
+
+    def _acquire(self, priority):
+        with self._cond:
+            ticket = (priority, next(self._sequence))
+            heapq.heappush(self._waiting, ticket)
+            while self._active >= self.max_concurrency or self._waiting[0] != ticket:
+                self._cond.wait()
+            heapq.heappop(self._waiting)
+            self._active += 1
+            self._cond.notify_all()
+
+    def _release(self):
+        with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+    def record(self, user_id, prompt_tokens: int, response_tokens: int):
+        with self._lock:
+            usage = self._usage[user_id]
+            usage["calls"] += 1
+            usage["prompt_tokens"] += prompt_tokens
+            usage["response_tokens"] += response_tokens
+            usage["cost_usd"] += (prompt_tokens * PROMPT_TOKEN_COST + response_tokens * RESPONSE_TOKEN_COST) / 1e6
+
+    @contextmanager
+    def slot(self, user_id, priority: int):
+        """
+        Hold one of the concurrent call slots; raises QuotaExceeded at once
+        when the user's bucket for this priority is empty
+        """
+        self._take_quota(user_id, priority)
+        self._acquire(priority)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def generate(self, user_id, priority: int, client, prompt: str, model: str = "gemini-2.0-flash"):
+        with self.slot(user_id, priority):
+            response = client.models.generate_content(model=model, contents=prompt)
+        metadata = getattr(response, "usage_metadata", None)
+        self.record(
+            user_id,
+            getattr(metadata, "prompt_token_count", None) or estimate_tokens(prompt),
+            getattr(metadata, "candidates_token_count", None) or estimate_tokens(response.text),
+        )
+        return response
+
+    def usage(self, user_id) -> dict:
+        with self._lock:
+            return dict(self._usage[user_id])
+
+    def queue_depth(self) -> int:
+        with self._lock:
+            return len(self._waiting)
+
+scheduler = LLMScheduler()
@@ -3,156 +3,15 @@ from datetime import datetime, date
 from mental_health_bot import ask_mental_health_bot, generate_wellness_tips
 from database import (
     register_user, get_user_by_email, verify_password, 
-    save_user_profile, get_user_profile, get_db_connection
+    save_user_profile, get_user_profile, update_user_profile,
+    save_journal_entry, save_mood_entry,
+    save_chat_message, get_chat_history, clear_chat_history
 )
-import sqlite3
+from prefetch import TASKS, start_prefetch
+from sessions import SESSION_COOKIE, SESSION_TTL_SECONDS, issue_token, verify_token, revoke_token
 
 st.set_page_config(page_title="MindCare AI", page_icon="🧠", layout="wide")
 
-# --- Initialize database tables for mental health features
-def create_mental_health_tables():
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Create journal entries table
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS journal_entries (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER NOT NULL,
-        title TEXT,
-        content TEXT NOT NULL,
-        mood_rating INTEGER,
-        is_private BOOLEAN DEFAULT 1,
-        entry_date TEXT NOT NULL,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (user_id) REFERENCES users (id)
-    )
-    """)
-    
-    # Create mood tracking table
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS mood_entries (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER NOT NULL,
-        mood_scale INTEGER NOT NULL,
-        energy_level INTEGER NOT NULL,
-        anxiety_level INTEGER NOT NULL,
-        sleep_quality INTEGER NOT NULL,
-        notes TEXT,
-        entry_date TEXT NOT NULL,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (user_id) REFERENCES users (id)
-    )
-    """)
-    
-    conn.commit()
-    conn.close()
-
-# Database functions for mental health features
-def save_journal_entry(user_id: int, entry_data: dict):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-    INSERT INTO journal_entries (user_id, title, content, mood_rating, is_private, entry_date)
-    VALUES (?, ?, ?, ?, ?, ?)
-    """, (
-        user_id,
-        entry_data.get("title"),
-        entry_data.get("content"),
-        entry_data.get("mood_rating"),
-        entry_data.get("is_private", True),
-        entry_data.get("entry_date")
-    ))
-    conn.commit()
-    conn.close()
-
-def get_user_journals(user_id: int):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-    SELECT * FROM journal_entries 
-    WHERE user_id = ? 
-    ORDER BY created_at DESC
-    """, (user_id,))
-    journals = [dict(row) for row in cursor.fetchall()]
-    conn.close()
-    return journals
-
-def save_mood_entry(user_id: int, mood_data: dict):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-    INSERT INTO mood_entries (user_id, mood_scale, energy_level, anxiety_level, sleep_quality, notes, entry_date)
-    VALUES (?, ?, ?, ?, ?, ?, ?)
-    """, (
-        user_id,
-        mood_data.get("mood_scale"),
-        mood_data.get("energy_level"),
-        mood_data.get("anxiety_level"),
-        mood_data.get("sleep_quality"),
-        mood_data.get("notes"),
-        mood_data.get("entry_date")
-    ))
-    conn.commit()
-    conn.close()
-
-def get_user_moods(user_id: int):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-    SELECT * FROM mood_entries 
-    WHERE user_id = ? 
-    ORDER BY created_at DESC
-    """, (user_id,))
-    moods = [dict(row) for row in cursor.fetchall()]
-    conn.close()
-    return moods
-
-def update_user_profile(user_id: int, profile: dict):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Check if profile exists
-    cursor.execute("SELECT id FROM user_profiles WHERE user_id = ?", (user_id,))
-    existing = cursor.fetchone()
-    
-    if existing:
-        cursor.execute("""
-        UPDATE user_profiles SET 
-        age = ?, gender = ?, activity_level = ?, medical_conditions = ?, 
-        food_preferences = ?, allergies = ?, health_goal = ?
-        WHERE user_id = ?
-        """, (
-            profile.get("age"),
-            profile.get("gender"),
-            profile.get("activity_level", profile.get("occupation")),  # Reuse field
-            profile.get("medical_conditions", profile.get("mental_health_concerns")),
-            profile.get("food_preferences", profile.get("support_preferences")),
-            profile.get("allergies", profile.get("stress_level")),  # Reuse field
-            profile.get("health_goal", "Mental Wellness"),
-            user_id
-        ))
-    else:
-        cursor.execute("""
-        INSERT INTO user_profiles (user_id, age, gender, activity_level, medical_conditions, food_preferences, allergies, health_goal)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            user_id,
-            profile.get("age"),
-            profile.get("gender"),
-            profile.get("activity_level", profile.get("occupation")),
-            profile.get("medical_conditions", profile.get("mental_health_concerns")),
-            profile.get("food_preferences", profile.get("support_preferences")),
-            profile.get("allergies", profile.get("stress_level")),
-            profile.get("health_goal", "Mental Wellness")
-        ))
-    
-    conn.commit()
-    conn.close()
-
-# Initialize mental health database tables
-create_mental_health_tables()
-
 # --- Initialize session state
 if 'logged_in' not in st.session_state:
     st.session_state['logged_in'] = False
@@ -163,6 +22,53 @@ if 'user_name' not in st.session_state:
 if 'user_id' not in st.session_state:
     st.session_state['user_id'] = None
 
+def sign_in(user):
+    st.session_state['logged_in'] = True
+    st.session_state['user_email'] = user['email']
+    st.session_state['user_name'] = user['name']
+    st.session_state['user_id'] = user['id']
+    # Load tab data and warm tips/insights in the background while the UI reruns
+    st.session_state['prefetch'] = start_prefetch(user['id'])
+
+def get_prefetch():
+    if 'prefetch' not in st.session_state:
+        st.session_state['prefetch'] = start_prefetch(st.session_state['user_id'])
+    return st.session_state['prefetch']
+
+def show_when_ready(name, render, waiting_message):
+    # Tips and insights come from slow LLM calls; never hold up the page for them
+    prefetch = get_prefetch()
+    future = prefetch.futures[name]
+    if future.done() and not future.cancelled() and future.exception() is None:
+        render(future.result())
+        return
+    if future.done():
+        # Cancelled or failed, usually because the read it depends on failed:
+        # run that read and this task again in the background
+        prefetch.refresh(TASKS[name][1] or name)
+    st.caption(waiting_message)
+    st.button("🔄 Check again", key=f"check_{name}")
+
+# --- Returning users: a valid session cookie skips the password check entirely
+if not st.session_state['logged_in']:
+    cookie_user = verify_token(st.context.cookies.get(SESSION_COOKIE))
+    if cookie_user:
+        st.session_state['session_token'] = st.context.cookies.get(SESSION_COOKIE)
+        sign_in(cookie_user)
+
+def sync_session_cookie():
+    # Streamlit can't send Set-Cookie, so a pending update is applied from a
+    # script on the run after login/logout. A cookie written by JavaScript
+    # can't be HttpOnly: any script on the page can read the token.
+    if 'cookie_update' not in st.session_state:
+        return
+    token = st.session_state.pop('cookie_update')
+    max_age = SESSION_TTL_SECONDS if token else 0
+    st.html(
+        f"<script>document.cookie = '{SESSION_COOKIE}={token}; max-age={max_age}; path=/; Secure; SameSite=Strict';</script>",
+        unsafe_allow_javascript=True,
+    )
+
 # --- Header UI
 st.markdown("""
 <div style='text-align: center; padding: 1rem; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); border-radius: 10px; margin-bottom: 2rem;'>
@@ -180,10 +86,9 @@ def login_tab():
         if login_submit:
             user = get_user_by_email(login_email)
             if user and verify_password(user['password_hash'], login_pass):
-                st.session_state['logged_in'] = True
-                st.session_state['user_email'] = user['email']
-                st.session_state['user_name'] = user['name']
-                st.session_state['user_id'] = user['id']
+                sign_in(user)
+                st.session_state['session_token'] = issue_token(user)
+                st.session_state['cookie_update'] = st.session_state['session_token']
                 st.success(f"Welcome back, {user['name']}! 🌟")
                 st.rerun()
             else:
@@ -215,10 +120,16 @@ def register_tab():
 
 def logout_button():
     if st.button("Logout 🚪", key="logout_button", use_container_width=True):
+        if st.session_state.get('session_token'):
+            revoke_token(st.session_state.pop('session_token'))
+        st.session_state['cookie_update'] = ""
+        if 'prefetch' in st.session_state:
+            st.session_state.pop('prefetch').cancel()
         st.session_state['logged_in'] = False
         st.session_state['user_email'] = None
         st.session_state['user_name'] = None
         st.session_state['user_id'] = None
+        st.session_state.pop('chat_history', None)
         st.success("You have been logged out safely. Take care! 💙")
         st.rerun()
 
@@ -256,15 +167,19 @@ def profile_tab():
                     "support_preferences": support_preferences
                 }
                 update_user_profile(st.session_state['user_id'], profile)
+                get_prefetch().refresh('profile')
                 st.success("Profile saved successfully! 🌟")
 
+    with st.expander("🌱 Your Wellness Tips", expanded=False):
+        show_when_ready('tips', st.markdown, "✨ Preparing your personalized wellness tips...")
+
 def chatbot_tab():
     st.markdown("### 💬 Chat with MindCare AI")
     st.markdown("Share your thoughts, feelings, or concerns. I'm here to listen and support you.")
     
-    # Chat history in session state
+    # Chat history in session state, loaded once from the user's shard
     if 'chat_history' not in st.session_state:
-        st.session_state['chat_history'] = []
+        st.session_state['chat_history'] = get_chat_history(st.session_state['user_id'])
     
     # Display chat history
     chat_container = st.container()
@@ -297,10 +212,12 @@ def chatbot_tab():
                 
                 # Add user message to history
                 st.session_state['chat_history'].append(("user", user_input, timestamp))
+                save_chat_message(st.session_state['user_id'], "user", user_input, timestamp)
                 
                 with st.spinner("MindCare AI is thinking..."):
-                    reply = ask_mental_health_bot(user_input)
+                    reply = ask_mental_health_bot(user_input, user_id=st.session_state['user_id'])
                     st.session_state['chat_history'].append(("bot", reply, timestamp))
+                    save_chat_message(st.session_state['user_id'], "bot", reply, timestamp)
                 
                 st.rerun()
             else:
@@ -308,6 +225,7 @@ def chatbot_tab():
     
     with col2:
         if st.button("Clear Chat 🗑️", use_container_width=True):
+            clear_chat_history(st.session_state['user_id'])
             st.session_state['chat_history'] = []
             st.rerun()
 
@@ -335,6 +253,7 @@ def journal_tab():
                     "entry_date": date.today().isoformat()
                 }
                 save_journal_entry(st.session_state['user_id'], entry_data)
+                get_prefetch().refresh('journals')
                 st.success("📝 Journal entry saved successfully!")
                 st.rerun()
             elif submitted:
@@ -342,10 +261,10 @@ def journal_tab():
     
     # Display previous entries
     st.markdown("### 📚 Your Previous Entries")
-    entries = get_user_journals(st.session_state['user_id'])
+    entries = get_prefetch().get('journals')  # last 5 entries, newest first
     
     if entries:
-        for entry in entries[-5:]:  # Show last 5 entries
+        for entry in entries:
             with st.expander(f"📖 {entry['title']} - {entry['entry_date']}"):
                 st.write(entry['content'])
                 st.markdown(f"**Mood Rating:** {entry['mood_rating']}/10")
@@ -386,16 +305,18 @@ def mood_tracker_tab():
                     "entry_date": date.today().isoformat()
                 }
                 save_mood_entry(st.session_state['user_id'], mood_data)
+                get_prefetch().refresh('recent_moods')
+                get_prefetch().refresh('moods')
                 st.success("📈 Mood entry logged successfully!")
                 st.rerun()
     
     # Display mood history
     st.markdown("### 📈 Your Mood Trends")
-    moods = get_user_moods(st.session_state['user_id'])
+    moods = get_prefetch().get('recent_moods')
     
     if moods and len(moods) > 0:
         # Simple mood visualization
-        recent_moods = moods[-7:]  # Last 7 entries
+        recent_moods = moods[::-1]  # Last 7 entries, oldest first
         dates = [entry['entry_date'] for entry in recent_moods]
         mood_values = [entry['mood_scale'] for entry in recent_moods]
         
@@ -404,7 +325,7 @@ def mood_tracker_tab():
         
         # Recent entries
         st.markdown("### Recent Mood Entries")
-        for mood in recent_moods[-3:]:
+        for mood in moods[:3]:
             with st.expander(f"📅 {mood['entry_date']} - Mood: {mood['mood_scale']}/10"):
                 col1, col2 = st.columns(2)
                 with col1:
@@ -417,8 +338,13 @@ def mood_tracker_tab():
                     st.write(f"**Notes:** {mood['notes']}")
     else:
         st.info("No mood entries yet. Start tracking to see your emotional patterns over time!")
+    
+    st.markdown("### 💡 Mood Insights")
+    show_when_ready('insights', st.markdown, "✨ Looking for patterns in your recent moods...")
 
 # --- Main App Logic ---
+sync_session_cookie()
+
 if not st.session_state['logged_in']:
     tabs = st.tabs(["🏠 Welcome", "🔐 Login", "📝 Sign Up"])
     
@@ -1,15 +1,22 @@
 from google import genai
 from config import GEMINI_API_KEY
+from llm_scheduler import scheduler, estimate_tokens, QuotaExceeded, INTERACTIVE, INSIGHTS
 import random
 
 # Initialize Gemini Client
 client = genai.Client(api_key=GEMINI_API_KEY)
 
-def ask_mental_health_bot(user_input):
+class FallbackText(str):
     """
-    Main function to interact with the mental health chatbot
+    Local text returned in place of a model reply (API error or quota
+    exceeded), so callers can avoid caching it
     """
-    prompt = f"""
+
+def build_chat_prompt(user_input):
+    """
+    Prompt shared by the blocking and streaming chat functions
+    """
+    return f"""
     You are MindCare AI, a compassionate and professional mental health support chatbot. You provide emotional support, active listening, and gentle guidance to users dealing with various mental health challenges.
 
     IMPORTANT GUIDELINES:
@@ -27,17 +34,48 @@ def ask_mental_health_bot(user_input):
 
     Respond with empathy and provide supportive guidance. If appropriate, offer specific coping techniques or mindfulness exercises.
     """
+
+CHAT_FALLBACK = "I'm sorry, I'm having trouble connecting right now. Please try again in a moment. In the meantime, remember that you're not alone, and it's okay to reach out for support. 💙"
+CHAT_QUOTA_FALLBACK = "You're sending messages faster than I can thoughtfully reply. Let's slow down together - take a slow, deep breath, and send your next message in a little while. I'm still here for you. 💙"
+
+def ask_mental_health_bot(user_input, user_id=None):
+    """
+    Main function to interact with the mental health chatbot
+    """
+    prompt = build_chat_prompt(user_input)
     
     try:
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=prompt
-        )
+        response = scheduler.generate(user_id, INTERACTIVE, client, prompt)
         return response.text
+    except QuotaExceeded:
+        return FallbackText(CHAT_QUOTA_FALLBACK)
+    except Exception as e:
+        return FallbackText(CHAT_FALLBACK)
+
+def stream_mental_health_bot(user_input, user_id=None):
+    """
+    Same as ask_mental_health_bot, but yields the reply in chunks as the
+    model produces them
+    """
+    prompt = build_chat_prompt(user_input)
+    parts = []
+    try:
+        with scheduler.slot(user_id, INTERACTIVE):
+            for chunk in client.models.generate_content_stream(
+                model="gemini-2.0-flash",
+                contents=prompt
+            ):
+                if chunk.text:
+                    parts.append(chunk.text)
+                    yield chunk.text
+        scheduler.record(user_id, estimate_tokens(prompt), estimate_tokens("".join(parts)))
+    except QuotaExceeded:
+        yield CHAT_QUOTA_FALLBACK
     except Exception as e:
-        return f"I'm sorry, I'm having trouble connecting right now. Please try again in a moment. In the meantime, remember that you're not alone, and it's okay to reach out for support. 💙"
+        if not parts:
+            yield CHAT_FALLBACK
 
-def generate_wellness_tips(user_profile=None):
+def generate_wellness_tips(user_profile=None, user_id=None, priority=INSIGHTS):
     """
     Generate personalized wellness tips based on user profile
     """
@@ -71,15 +109,12 @@ def generate_wellness_tips(user_profile=None):
         prompt = base_prompt
     
     try:
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=prompt
-        )
+        response = scheduler.generate(user_id, priority, client, prompt)
         return response.text
     except Exception as e:
-        return get_fallback_tips()
+        return FallbackText(get_fallback_tips())
 
-def generate_mood_insights(mood_data):
+def generate_mood_insights(mood_data, user_id=None, priority=INSIGHTS):
     """
     Generate insights based on mood tracking data
     """
@@ -113,15 +148,12 @@ def generate_mood_insights(mood_data):
     """
     
     try:
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=prompt
-        )
+        response = scheduler.generate(user_id, priority, client, prompt)
         return response.text
     except Exception as e:
-        return get_fallback_insights(avg_mood, avg_energy, avg_anxiety, avg_sleep)
+        return FallbackText(get_fallback_insights(avg_mood, avg_energy, avg_anxiety, avg_sleep))
 
-def generate_journal_reflection(journal_entry):
+def generate_journal_reflection(journal_entry, user_id=None, priority=INSIGHTS):
     """
     Provide gentle reflection and insights on journal entries
     """
@@ -140,13 +172,10 @@ def generate_journal_reflection(journal_entry):
     """
     
     try:
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=prompt
-        )
+        response = scheduler.generate(user_id, priority, client, prompt)
         return response.text
     except Exception as e:
-        return "Thank you for sharing your thoughts with me. Journaling is such a powerful tool for self-reflection and emotional processing. Keep writing and being honest with yourself - you're doing great work in understanding your inner world. 💙"
+        return FallbackText("Thank you for sharing your thoughts with me. Journaling is such a powerful tool for self-reflection and emotional processing. Keep writing and being honest with yourself - you're doing great work in understanding your inner world. 💙")
 
 def get_daily_affirmation():
     """
@@ -0,0 +1,197 @@
+"""
+Nutrition lookup over data.csv.
+
+The food table is loaded once into columnar NumPy arrays and cached next to
+the CSV as an .npz file, so restarts skip CSV parsing and index building.
+The cache is replaced atomically, and one that can't be read is rebuilt.
+Names can be looked up exactly, by prefix (autocomplete) or fuzzily via a
+character-trigram index, and meal / daily macro totals are computed for many
+meals at once with vectorized sums.
+"""
+import csv
+import functools
+import os
+import tempfile
+
+import numpy as np
+
+DATA_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data.csv")
+MACRO_COLUMNS = ("calories", "protein", "carbs", "fat")
+CACHE_VERSION = 1
+
+def _normalize(name: str) -> str:
+    return " ".join(name.lower().split())
+
+def _trigrams(name: str):
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class FoodTable:
+    def __init__(self, names, macros, sorted_order, trigram_keys, trigram_offsets, trigram_postings):
+        self.names = names                        # (n,) str, as written in the CSV
+        self.macros = macros                      # (n, 4) float64: calories, protein, carbs, fat
+        self.sorted_order = sorted_order          # (n,) indices ordering names alphabetically
+        self.sorted_names = np.char.lower(names)[sorted_order]
+        self.trigram_keys = trigram_keys          # (t,) sorted trigrams
+        self.trigram_offsets = trigram_offsets    # (t + 1,) CSR offsets into trigram_postings
+        self.trigram_postings = trigram_postings  # food indices containing each trigram
+        self.trigram_counts = np.bincount(trigram_postings, minlength=len(names))
+        self._index = {_normalize(name): i for i, name in enumerate(names.tolist())}
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def from_rows(cls, names, macros):
+        names = np.asarray(names, dtype=str)
+        macros = np.asarray(macros, dtype=np.float64).reshape(len(names), len(MACRO_COLUMNS))
+        sorted_order = np.argsort(np.char.lower(names), kind="stable")
+
+        grams, items = [], []
+        for i, name in enumerate(names.tolist()):
+            for gram in _trigrams(_normalize(name)):
+                grams.append(gram)
+                items.append(i)
+        grams = np.asarray(grams, dtype=str)
+        items = np.asarray(items, dtype=np.int64)
+        order = np.argsort(grams, kind="stable")
+        trigram_keys, starts = np.unique(grams[order], return_index=True)
+        trigram_offsets = np.append(starts, len(order)).astype(np.int64)
+        return cls(names, macros, sorted_order, trigram_keys, trigram_offsets, items[order])
+
+    def index_of(self, name: str) -> int:
+        """
+        Row index of a food by (case and whitespace insensitive) name, or -1
+        """
+        return self._index.get(_normalize(name), -1)
+
+    def indices_of(self, names) -> np.ndarray:
+        return np.fromiter((self.index_of(name) for name in names), dtype=np.int64, count=len(names))
+
+    def prefix_search(self, prefix: str, limit: int = 10):
+        prefix = prefix.lower()
+        lo = np.searchsorted(self.sorted_names, prefix, side="left")
+        hi = np.searchsorted(self.sorted_names, prefix + "\U0010ffff", side="left")
+        return self.names[self.sorted_order[lo:min(hi, lo + limit)]].tolist()
+
+    def fuzzy_search(self, query: str, limit: int = 10, min_score: float = 0.2):
+        """
+        Names ranked by trigram Jaccard similarity to the query, for typos
+        and partial matches the prefix search misses
+        """
+        grams = np.asarray(sorted(_trigrams(_normalize(query))), dtype=str)
+        positions = np.searchsorted(self.trigram_keys, grams)
+        found = positions < len(self.trigram_keys)
+        found[found] = self.trigram_keys[positions[found]] == grams[found]
+        positions = positions[found]
+        if len(positions) == 0:
+            return []
+
+        postings = np.concatenate([
+            self.trigram_postings[self.trigram_offsets[p]:self.trigram_offsets[p + 1]] for p in positions
+        ])
+        shared = np.bincount(postings, minlength=len(self.names))
+        candidates = np.flatnonzero(shared)
+        scores = shared[candidates] / (len(grams) + self.trigram_counts[candidates] - shared[candidates])
+        keep = scores >= min_score
+        candidates, scores = candidates[keep], scores[keep]
+        if len(candidates) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            candidates, scores = candidates[top], scores[top]
+        ranked = np.argsort(-scores, kind="stable")
+        return [(str(self.names[candidates[i]]), float(scores[i])) for i in ranked]
+
+    def meal_totals(self, meal_ids, food_indices, quantities=None, n_meals: int = None) -> np.ndarray:
+        """
+        Sum macros for many meals at once.
+
+        meal_ids, food_indices and quantities (servings, default 1) are
+        parallel arrays with one element per logged food item. Returns an
+        (n_meals, 4) array of calories, protein, carbs and fat.
+        """
+        meal_ids = np.asarray(meal_ids, dtype=np.int64)
+        food_indices = np.asarray(food_indices, dtype=np.int64)
+        if np.any(food_indices < 0):
+            raise ValueError("Unknown food in meal (index -1)")
+        if quantities is None:
+            quantities = np.ones(len(food_indices))
+        if n_meals is None:
+            n_meals = int(meal_ids.max()) + 1 if len(meal_ids) else 0
+        contributions = self.macros[food_indices] * np.asarray(quantities, dtype=np.float64)[:, None]
+        return np.column_stack([
+            np.bincount(meal_ids, weights=contributions[:, column], minlength=n_meals)
+            for column in range(len(MACRO_COLUMNS))
+        ]).reshape(n_meals, len(MACRO_COLUMNS))
+
+    def daily_macros(self, meal_days, meal_totals, n_days: int = None) -> np.ndarray:
+        """
+        Roll (n_meals, 4) meal totals up to (n_days, 4) daily totals, where
+        meal_days gives the day number of each meal
+        """
+        meal_days = np.asarray(meal_days, dtype=np.int64)
+        if n_days is None:
+            n_days = int(meal_days.max()) + 1 if len(meal_days) else 0
+        daily = np.zeros((n_days, len(MACRO_COLUMNS)))
+        np.add.at(daily, meal_days, meal_totals)
+        return daily
+
+    def save(self, cache_path: str, source_stat):
+        """
+        Write the cache to a temp file and rename it into place, so readers
+        never see a partly written cache
+        """
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(cache_path)), suffix=".npz.tmp")
+        try:
+            with os.fdopen(fd, "wb") as cache:
+                np.savez(
+                    cache,
+                    version=CACHE_VERSION,
+                    source=np.array([source_stat.st_size, source_stat.st_mtime_ns], dtype=np.int64),
+                    names=self.names,
+                    macros=self.macros,
+                    sorted_order=self.sorted_order,
+                    trigram_keys=self.trigram_keys,
+                    trigram_offsets=self.trigram_offsets,
+                    trigram_postings=self.trigram_postings,
+                )
+            os.replace(temp_path, cache_path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+def _read_csv(csv_path: str):
+    names, macros = [], []
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            names.append(row["food"].strip())
+            macros.append([float(row[column] or 0) for column in MACRO_COLUMNS])
+    return names, macros
+
+def load_food_table(csv_path: str = DATA_CSV, cache_path: str = None) -> FoodTable:
+    """
+    Load the food table, reusing the binary cache while the CSV is unchanged
+    """
+    if cache_path is None:
+        cache_path = csv_path + ".npz"
+    stat = os.stat(csv_path)
+    try:
+        with np.load(cache_path, allow_pickle=False) as cached:
+            if (int(cached["version"]) == CACHE_VERSION
+                    and cached["source"].tolist() == [stat.st_size, stat.st_mtime_ns]):
+                return FoodTable(
+                    cached["names"], cached["macros"], cached["sorted_order"],
+                    cached["trigram_keys"], cached["trigram_offsets"], cached["trigram_postings"],
+                )
+    except Exception:
+        pass  # missing, stale or corrupt (e.g. BadZipFile, EOFError): rebuild it
+
+    table = FoodTable.from_rows(*_read_csv(csv_path))
+    try:
+        table.save(cache_path, stat)
+    except OSError:
+        pass  # read-only deployments still work, they just rebuild on start
+    return table
+
+@functools.lru_cache(maxsize=None)
+def get_food_table() -> FoodTable:
+    return load_food_table()
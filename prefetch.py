@@ -0,0 +1,175 @@
+"""
+Speculative prefetch of a user's tab data right after login.
+
+start_prefetch() submits the recent journals, recent moods and profile
+reads to a worker pool, and chains the wellness tips and mood insights LLM
+calls onto the profile and mood results. Tabs read results through
+Prefetch.get(), which waits on the future if it is still running and
+computes inline if there is none. Tips and insights are also kept in a
+small cache, keyed on the data they were generated from, so a re-login
+within RESULT_TTL_SECONDS reuses them without another LLM call. Only real
+model output is cached; the bot's local fallbacks (FallbackText) are not, so
+an API outage or quota hit at login does not stick once the API recovers.
+Expired entries are pruned whenever a result is stored.
+
+Speculative LLM calls run at BATCH priority; recomputations triggered by the
+user saving something (refresh()) run at INSIGHTS priority. cancel() on
+logout drops queued work and discards anything still running.
+"""
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+
+import database
+from llm_scheduler import BATCH, INSIGHTS
+from mental_health_bot import FallbackText, generate_wellness_tips, generate_mood_insights
+
+PREFETCH_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="mindcare-prefetch")
+RECENT_JOURNALS = 5
+RECENT_MOODS = 7
+INSIGHT_MOODS = 14
+RESULT_TTL_SECONDS = 30 * 60
+
+_results = {}
+_results_lock = threading.Lock()
+
+def profile_for_tips(profile_row):
+    """
+    Undo the column reuse in update_user_profile to get the fields
+    generate_wellness_tips expects
+    """
+    if profile_row is None:
+        return None
+    return {
+        "age": profile_row['age'],
+        "occupation": profile_row['activity_level'],
+        "stress_level": profile_row['allergies'],
+        "mental_health_concerns": profile_row['medical_conditions'],
+        "support_preferences": profile_row['food_preferences'],
+    }
+
+def _cached(user_id, kind, fingerprint, compute):
+    now = time.time()
+    with _results_lock:
+        entry = _results.get((user_id, kind))
+    if entry and entry[0] == fingerprint and entry[1] > now:
+        return entry[2]
+    value = compute()
+    if isinstance(value, FallbackText):
+        return value
+    with _results_lock:
+        for key in [key for key, (_, expires_at, _) in _results.items() if expires_at <= now]:
+            del _results[key]
+        _results[(user_id, kind)] = (fingerprint, now + RESULT_TTL_SECONDS, value)
+    return value
+
+def _load_journals(prefetch, _):
+    return database.get_user_journals(prefetch.user_id, limit=RECENT_JOURNALS)
+
+def _load_moods(prefetch, _):
+    return database.get_user_moods(prefetch.user_id, include_notes=False, limit=INSIGHT_MOODS)
+
+def _load_recent_moods(prefetch, _):
+    return database.get_user_moods(prefetch.user_id, limit=RECENT_MOODS)
+
+def _load_profile(prefetch, _):
+    return database.get_user_profile(prefetch.user_id)
+
+def _warm_tips(prefetch, profile_row):
+    profile = profile_for_tips(profile_row)
+    fingerprint = tuple(sorted(profile.items())) if profile else None
+    return _cached(prefetch.user_id, "tips", fingerprint,
+                   lambda: generate_wellness_tips(profile, prefetch.user_id, prefetch.priority))
+
+def _warm_insights(prefetch, moods):
+    fingerprint = (len(moods), moods[0]['id'] if moods else None)
+    return _cached(prefetch.user_id, "insights", fingerprint,
+                   lambda: generate_mood_insights(moods, prefetch.user_id, prefetch.priority))
+
+# name -> (task, name of the task whose result it needs)
+TASKS = {
+    "journals": (_load_journals, None),
+    "recent_moods": (_load_recent_moods, None),
+    "moods": (_load_moods, None),
+    "profile": (_load_profile, None),
+    "tips": (_warm_tips, "profile"),
+    "insights": (_warm_insights, "moods"),
+}
+
+class Prefetch:
+    def __init__(self, user_id: int):
+        self.user_id = user_id
+        self.priority = BATCH
+        self.futures = {}
+        self.cancelled = False
+        self._lock = threading.Lock()
+
+    def _submit(self, name):
+        task, upstream_name = TASKS[name]
+        if upstream_name is None:
+            return PREFETCH_EXECUTOR.submit(task, self, None)
+
+        upstream = self.futures[upstream_name]
+        downstream = Future()
+
+        def copy_result(inner):
+            try:
+                if inner.cancelled():
+                    downstream.cancel()
+                elif inner.exception() is not None:
+                    downstream.set_exception(inner.exception())
+                else:
+                    downstream.set_result(inner.result())
+            except InvalidStateError:
+                pass  # downstream was cancelled meanwhile
+
+        def start_downstream(done):
+            if self.cancelled or done.cancelled() or done.exception() is not None or downstream.cancelled():
+                downstream.cancel()
+                return
+            try:
+                PREFETCH_EXECUTOR.submit(task, self, done.result()).add_done_callback(copy_result)
+            except RuntimeError:
+                downstream.cancel()  # executor shut down
+
+        upstream.add_done_callback(start_downstream)
+        return downstream
+
+    def start(self):
+        with self._lock:
+            for name in TASKS:
+                self.futures[name] = self._submit(name)
+        return self
+
+    def refresh(self, name):
+        """
+        Reload one result and everything computed from it, e.g. after the
+        user saves a new mood entry
+        """
+        with self._lock:
+            if self.cancelled:
+                return
+            self.priority = INSIGHTS
+            stale = [name] + [other for other, (_, upstream) in TASKS.items() if upstream == name]
+            for stale_name in stale:
+                self.futures[stale_name].cancel()
+                self.futures[stale_name] = self._submit(stale_name)
+
+    def get(self, name):
+        future = self.futures.get(name)
+        if future is not None and not future.cancelled():
+            try:
+                return future.result()
+            except Exception:
+                pass
+        task, upstream_name = TASKS[name]
+        return task(self, self.get(upstream_name) if upstream_name else None)
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            for future in self.futures.values():
+                future.cancel()
+
+def start_prefetch(user_id: int) -> Prefetch:
+    return Prefetch(user_id).start()
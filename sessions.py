@@ -0,0 +1,144 @@
+"""
+HMAC-signed, expiring session tokens.
+
+A token carries the user's id, name and email plus a session id and expiry,
+signed (not encrypted, so readable by whoever holds it) with SESSION_SECRET:
+
+    base64url(json payload) "." base64url(hmac-sha256)
+
+Verifying one is a single HMAC and a set lookup, so returning users skip
+both get_user_by_email and the PBKDF2 in verify_password. Logout revokes the
+session id in the sessions table; the revoked ids are mirrored in memory and
+rebuilt from the table every REVOCATION_REFRESH_SECONDS, so other processes
+pick them up and expired ids drop out. Each refresh also deletes expired
+session rows.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import tempfile
+import threading
+import time
+
+import database
+from config import SESSION_SECRET
+
+SESSION_COOKIE = "mindcare_session"
+SESSION_TTL_SECONDS = 14 * 24 * 3600
+REVOCATION_REFRESH_SECONDS = 30
+SECRET_FILE = "session_secret.key"
+MIN_SECRET_BYTES = 32
+
+_revoked = set()
+_revoked_loaded_at = 0.0
+_revoked_lock = threading.Lock()
+_secret = None
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+def _create_secret_file() -> bytes:
+    """
+    Write a new key to an owner-only temp file and link it into place, so
+    SECRET_FILE never exists half-written; if another process links its key
+    first, use that one
+    """
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(SECRET_FILE)))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(secrets.token_bytes(MIN_SECRET_BYTES))
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.link(temp_path, SECRET_FILE)
+        except FileExistsError:
+            pass
+    finally:
+        os.unlink(temp_path)
+    with open(SECRET_FILE, "rb") as f:
+        return f.read()
+
+def _signing_key() -> bytes:
+    global _secret
+    if _secret is None:
+        if SESSION_SECRET:
+            key, source = SESSION_SECRET.encode("utf-8"), "MINDCARE_SESSION_SECRET"
+        elif os.path.exists(SECRET_FILE):
+            with open(SECRET_FILE, "rb") as f:
+                key, source = f.read(), SECRET_FILE
+        else:
+            key, source = _create_secret_file(), SECRET_FILE
+        if len(key) < MIN_SECRET_BYTES:
+            raise RuntimeError(f"Session key from {source} is shorter than {MIN_SECRET_BYTES} bytes; "
+                               f"refusing to sign sessions with it")
+        _secret = key
+    return _secret
+
+def _sign(payload: str) -> str:
+    return _b64encode(hmac.new(_signing_key(), payload.encode("ascii"), hashlib.sha256).digest())
+
+def _revoked_sessions():
+    global _revoked, _revoked_loaded_at
+    now = time.time()
+    if now - _revoked_loaded_at > REVOCATION_REFRESH_SECONDS:
+        with _revoked_lock:
+            if now - _revoked_loaded_at > REVOCATION_REFRESH_SECONDS:
+                database.delete_expired_sessions(int(now))
+                _revoked = database.get_revoked_sessions(int(now))
+                _revoked_loaded_at = now
+    return _revoked
+
+def issue_token(user) -> str:
+    """
+    Create a session for a user row (id, name, email) and return its token
+    """
+    session_id = secrets.token_urlsafe(16)
+    expires_at = int(time.time()) + SESSION_TTL_SECONDS
+    database.create_session(session_id, user['id'], expires_at)
+    payload = _b64encode(json.dumps({
+        "sid": session_id,
+        "uid": user['id'],
+        "name": user['name'],
+        "email": user['email'],
+        "exp": expires_at,
+    }, separators=(",", ":")).encode("utf-8"))
+    return f"{payload}.{_sign(payload)}"
+
+def _decode(token: str):
+    # Anything outside base64url can't be one of ours, and would make the
+    # ASCII encode in _sign or compare_digest raise
+    if not isinstance(token, str) or not token.isascii() or token.count(".") != 1:
+        return None
+    payload, signature = token.split(".")
+    if not hmac.compare_digest(signature, _sign(payload)):
+        return None
+    try:
+        return json.loads(_b64decode(payload))
+    except ValueError:
+        return None
+
+def verify_token(token: str):
+    """
+    Return {"id", "name", "email"} for a valid, unexpired, unrevoked token,
+    otherwise None
+    """
+    claims = _decode(token)
+    if claims is None or claims["exp"] <= time.time() or claims["sid"] in _revoked_sessions():
+        return None
+    return {"id": claims["uid"], "name": claims["name"], "email": claims["email"]}
+
+def revoke_token(token: str):
+    claims = _decode(token)
+    if claims is None:
+        return
+    # Write the table first: a refresh rebuilds _revoked from it under the
+    # same lock, so the id can't be dropped between the two steps
+    database.revoke_session(claims["sid"])
+    with _revoked_lock:
+        _revoked.add(claims["sid"])
@@ -0,0 +1,88 @@
+"""
+Migrate per-user tables between shard layouts.
+
+    python shard_tool.py status 4
+    python shard_tool.py rebalance 1 4     # move a single-file deployment to 4 shards
+    python shard_tool.py rebalance 4 6     # grow an existing deployment
+
+For every (old shard, new shard, table) the rows are copied and deleted in
+one SQLite transaction spanning both files (the old shard is ATTACHed to the
+new one, which is atomic with SQLite's default rollback journal but not in
+WAL mode), so each batch either moves completely or not at all. An
+interrupted run can simply be re-run; rows already moved are no longer in
+the old shard and are not copied twice.
+"""
+import sqlite3
+import sys
+
+import database
+from database import USER_TABLES, shard_for_user, shard_path, create_shard_tables
+
+def shard_row_counts(shard_count: int):
+    counts = []
+    for index in range(shard_count):
+        conn = sqlite3.connect(shard_path(index, shard_count))
+        counts.append({
+            table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in USER_TABLES
+        })
+        conn.close()
+    return counts
+
+def _move_rows(source_path: str, target_path: str, target_index: int, new_count: int) -> int:
+    conn = sqlite3.connect(target_path, isolation_level=None)
+    conn.create_function("target_shard", 1, lambda user_id: shard_for_user(user_id, new_count),
+                         deterministic=True)
+    conn.execute("ATTACH DATABASE ? AS source", (source_path,))
+    moved = 0
+    try:
+        for table in USER_TABLES:
+            columns = ", ".join(row[1] for row in conn.execute(f"PRAGMA main.table_info({table})") if row[1] != "id")
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = conn.execute(f"""
+                INSERT INTO main.{table} ({columns})
+                SELECT {columns} FROM source.{table}
+                WHERE target_shard(user_id) = ?
+                ORDER BY id
+                """, (target_index,))
+                moved += cursor.rowcount
+                conn.execute(f"DELETE FROM source.{table} WHERE target_shard(user_id) = ?", (target_index,))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+    finally:
+        conn.execute("DETACH DATABASE source")
+        conn.close()
+    return moved
+
+def rebalance(old_count: int, new_count: int) -> int:
+    """
+    Move every per-user row from the old_count layout to the new_count layout
+    and return the number of rows moved
+    """
+    for index in range(new_count):
+        create_shard_tables(shard_path(index, new_count))
+
+    moved = 0
+    for source_index in range(old_count):
+        source_path = shard_path(source_index, old_count)
+        create_shard_tables(source_path)
+        for target_index in range(new_count):
+            target_path = shard_path(target_index, new_count)
+            if target_path != source_path:
+                moved += _move_rows(source_path, target_path, target_index, new_count)
+    return moved
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "status":
+        for index, counts in enumerate(shard_row_counts(int(sys.argv[2]))):
+            print(f"shard {index}: {counts}")
+    elif len(sys.argv) == 4 and sys.argv[1] == "rebalance":
+        old_count, new_count = int(sys.argv[2]), int(sys.argv[3])
+        print(f"Moved {rebalance(old_count, new_count)} rows from {old_count} to {new_count} shards")
+        print(f"Set MINDCARE_SHARD_COUNT={new_count} (shard dir: {database.SHARD_DIR}) before restarting the app")
+    else:
+        print(__doc__)
+        sys.exit(1)
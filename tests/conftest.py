@@ -0,0 +1,26 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# database creates its tables on import, relative to the working directory;
+# keep that away from the checked-in database
+_launch_dir = os.getcwd()
+os.chdir(tempfile.mkdtemp(prefix="mindcare_tests_"))
+import database  # noqa: E402
+os.chdir(_launch_dir)
+
+@pytest.fixture
+def fresh_db(tmp_path, monkeypatch):
+    """
+    Run against an empty single-file database in a temporary directory
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(database, "DB_NAME", str(tmp_path / "mindcare.db"))
+    monkeypatch.setattr(database, "SHARD_COUNT", 1)
+    database.create_tables()
+    return tmp_path
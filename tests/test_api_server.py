@@ -0,0 +1,100 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+import api_server
+from api_server import HTTPError, Request
+
+def call(method, path, body=None, token=None):
+    headers = {"authorization": f"Bearer {token}"} if token else {}
+    request = Request(method, path, headers, json.dumps(body).encode("utf-8") if body is not None else b"")
+    return asyncio.run(api_server.dispatch(request))
+
+def status_of(*args, **kwargs):
+    try:
+        return call(*args, **kwargs)[0]
+    except HTTPError as e:
+        return e.status
+
+@pytest.fixture
+def token(fresh_db):
+    assert call("POST", "/register", {"name": "Ada", "email": "ada@example.com", "password": "pw"})[0] == 201
+    return call("POST", "/login", {"email": "ada@example.com", "password": "pw"})[1]["token"]
+
+@pytest.mark.parametrize("body", [
+    {"name": "Ada", "email": "ada@example.com", "password": 123},
+    {"name": ["Ada"], "email": "ada@example.com", "password": "pw"},
+    {"name": "Ada", "email": 1, "password": "pw"},
+    {"name": "Ada", "email": "ada@example.com", "password": "pw", "phone": 5551234},
+    {"name": "", "email": "ada@example.com", "password": "pw"},
+])
+def test_register_rejects_bad_fields(fresh_db, body):
+    assert status_of("POST", "/register", body) == 400
+
+@pytest.mark.parametrize("body", [
+    {"email": "ada@example.com", "password": 123},
+    {"email": None, "password": "pw"},
+])
+def test_login_rejects_bad_fields(token, body):
+    assert status_of("POST", "/login", body) == 400
+
+def test_login_with_wrong_password(token):
+    assert status_of("POST", "/login", {"email": "ada@example.com", "password": "nope"}) == 401
+
+def test_journal_content_must_be_a_string(token):
+    assert status_of("POST", "/journal", {"content": 123}, token) == 400
+    assert status_of("POST", "/journal", {"content": "Today was fine."}, token) == 201
+
+def test_malformed_token_is_unauthorized(fresh_db):
+    assert status_of("GET", "/mood", token="é.x") == 401
+
+def collect(generator_fn, limit=None):
+    async def run():
+        items = []
+        stream = api_server.iterate_in_thread(generator_fn)
+        try:
+            async for item in stream:
+                items.append(item)
+                if len(items) == limit:
+                    break
+        finally:
+            await stream.aclose()
+        return items
+    return asyncio.run(run())
+
+def test_iterate_in_thread_reraises_generator_errors():
+    def failing():
+        yield "partial"
+        raise RuntimeError("model went away")
+    with pytest.raises(RuntimeError):
+        collect(failing)
+
+def test_iterate_in_thread_closes_generator_when_consumer_stops():
+    closed = threading.Event()
+    def endless():
+        try:
+            while True:
+                yield "chunk"
+        finally:
+            closed.set()
+    assert collect(endless, limit=2) == ["chunk", "chunk"]
+    assert closed.wait(5)
+
+def test_chat_reply_is_saved_when_client_disconnects(token, monkeypatch):
+    def stream(message, user_id):
+        yield "Thank you "
+        yield "for sharing."
+    monkeypatch.setattr(api_server.mental_health_bot, "stream_mental_health_bot", stream)
+
+    async def disconnect_after_first_chunk():
+        status, response = await api_server.dispatch(
+            Request("POST", "/chat", {"authorization": f"Bearer {token}"}, b'{"message": "hi"}'))
+        async for _ in response.chunks:
+            break
+        await response.chunks.aclose()
+    asyncio.run(disconnect_after_first_chunk())
+
+    history = call("GET", "/chat", token=token)[1]["history"]
+    assert [(entry["role"], entry["message"]) for entry in history] == [("user", "hi"), ("bot", "Thank you ")]
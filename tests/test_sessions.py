@@ -0,0 +1,85 @@
+import json
+import os
+import stat
+
+import pytest
+
+import database
+import sessions
+
+USER = {"id": 1, "name": "Ada", "email": "ada@example.com"}
+
+@pytest.fixture(autouse=True)
+def fresh_sessions(fresh_db, monkeypatch):
+    monkeypatch.setattr(sessions, "SESSION_SECRET", "")
+    monkeypatch.setattr(sessions, "_secret", None)
+    monkeypatch.setattr(sessions, "_revoked", set())
+    monkeypatch.setattr(sessions, "_revoked_loaded_at", 0.0)
+
+def sign_with(key, claims):
+    payload = sessions._b64encode(json.dumps(claims).encode("utf-8"))
+    signature = sessions.hmac.new(key, payload.encode("ascii"), sessions.hashlib.sha256).digest()
+    return f"{payload}.{sessions._b64encode(signature)}"
+
+def forged_claims(**overrides):
+    claims = {"sid": "forged", "uid": 1, "name": "Ada", "email": "ada@example.com", "exp": 2 ** 40}
+    claims.update(overrides)
+    return claims
+
+def test_issued_token_verifies():
+    assert sessions.verify_token(sessions.issue_token(USER)) == USER
+
+def test_tampered_payload_is_rejected():
+    payload, signature = sessions.issue_token(USER).split(".")
+    claims = json.loads(sessions._b64decode(payload))
+    claims["uid"] = 2
+    tampered = sessions._b64encode(json.dumps(claims).encode("utf-8"))
+    assert sessions.verify_token(f"{tampered}.{signature}") is None
+
+@pytest.mark.parametrize("key", [b"", b"\0" * 32, b"some-other-server-secret-of-32-bytes"])
+def test_token_signed_with_another_key_is_rejected(key):
+    sessions.issue_token(USER)  # creates the real key
+    assert sessions.verify_token(sign_with(key, forged_claims())) is None
+
+def test_expired_token_is_rejected(monkeypatch):
+    monkeypatch.setattr(sessions, "SESSION_TTL_SECONDS", -1)
+    assert sessions.verify_token(sessions.issue_token(USER)) is None
+
+def test_revoked_token_is_rejected():
+    token = sessions.issue_token(USER)
+    sessions.revoke_token(token)
+    assert sessions.verify_token(token) is None
+
+def test_revocation_by_another_process_is_picked_up_on_refresh(monkeypatch):
+    token = sessions.issue_token(USER)
+    assert sessions.verify_token(token) == USER
+    claims = json.loads(sessions._b64decode(token.split(".")[0]))
+    database.revoke_session(claims["sid"])
+    monkeypatch.setattr(sessions, "_revoked_loaded_at", 0.0)
+    assert sessions.verify_token(token) is None
+
+@pytest.mark.parametrize("token", [None, "", "abc", "a.b.c", "é.x", "x.é", "\udcff.x", "!!!.???"])
+def test_malformed_token_is_rejected(token):
+    assert sessions.verify_token(token) is None
+
+def test_non_ascii_signature_on_valid_payload_is_rejected():
+    payload = sessions.issue_token(USER).split(".")[0]
+    assert sessions.verify_token(f"{payload}.é") is None
+
+def test_key_file_is_created_owner_only():
+    key = sessions._signing_key()
+    assert len(key) >= sessions.MIN_SECRET_BYTES
+    assert stat.S_IMODE(os.stat(sessions.SECRET_FILE).st_mode) == 0o600
+    assert sorted(os.listdir(".")) == ["mindcare.db", sessions.SECRET_FILE]
+
+@pytest.mark.parametrize("contents", [b"", b"half-written"])
+def test_short_key_file_is_refused(contents):
+    with open(sessions.SECRET_FILE, "wb") as f:
+        f.write(contents)
+    with pytest.raises(RuntimeError):
+        sessions.issue_token(USER)
+
+def test_short_secret_setting_is_refused(monkeypatch):
+    monkeypatch.setattr(sessions, "SESSION_SECRET", "short")
+    with pytest.raises(RuntimeError):
+        sessions.issue_token(USER)